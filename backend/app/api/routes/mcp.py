@@ -87,7 +87,7 @@ async def _refresh_mcp_tools():
             return
 
         # 🔥 调试日志：显示当前运行的服务器
-        active_servers = list(mcp_manager._active_clients.keys())
+        active_servers = list(mcp_manager.active_server_names)
         logger.info(f"🔧 当前运行中的 MCP 服务器: {active_servers}")
 
         # 🔥 策略：清空所有 mcp_dynamic 类别的工具，然后重新注册
@@ -1,5 +1,8 @@
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 import openai
 import anthropic
@@ -8,6 +11,63 @@ import httpx
 from app.core.config import settings
 from app.core.ai_config_manager import ai_config_manager
 
+logger = logging.getLogger(__name__)
+
+
+# SDK 客户端缓存：(客户端类型, api_key, base_url) -> (事件循环, 客户端)
+# 每个客户端持有自己的 httpx 连接池，复用后同一供应商的连续请求沿用已建立的
+# TCP/TLS 连接，不必每轮对话都重新握手；客户端绑定创建时的事件循环，循环变化时重建。
+# 按 LRU 限制数量，被替换或淘汰的客户端会关闭以释放其连接池
+_client_cache: "OrderedDict[Tuple[str, str, Optional[str]], Tuple[asyncio.AbstractEventLoop, Any]]" = OrderedDict()
+_client_cache_max_size = 8
+
+# 正在关闭的客户端任务（保留引用，避免任务在完成前被垃圾回收）
+_closing_tasks: Set["asyncio.Future"] = set()
+
+
+async def _close_client_quietly(client) -> None:
+    """关闭 SDK 客户端，忽略关闭过程中的异常（连接可能已随旧事件循环失效）"""
+    try:
+        await client.close()
+    except Exception as e:
+        logger.debug(f"关闭 AI 客户端失败: {e}")
+
+
+def _discard_client(loop: asyncio.AbstractEventLoop, client) -> None:
+    """关闭不再使用的客户端
+
+    旧事件循环仍在运行（其他线程）时交给它关闭；否则在当前循环中关闭
+    """
+    current_loop = asyncio.get_running_loop()
+    if loop is not current_loop and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_close_client_quietly(client), loop)
+        return
+    task = current_loop.create_task(_close_client_quietly(client))
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+def _get_client(client_cls, api_key: str, base_url: Optional[str] = None):
+    """获取（或创建）可复用的 OpenAI 兼容 / Anthropic 异步客户端"""
+    loop = asyncio.get_running_loop()
+    key = (client_cls.__name__, api_key, base_url)
+    cached = _client_cache.get(key)
+    if cached is not None and cached[0] is loop:
+        _client_cache.move_to_end(key)
+        return cached[1]
+
+    if cached is not None:
+        # 事件循环已变化：旧客户端无法复用，关闭后重建
+        del _client_cache[key]
+        _discard_client(*cached)
+    elif len(_client_cache) >= _client_cache_max_size:
+        _, evicted = _client_cache.popitem(last=False)
+        _discard_client(*evicted)
+
+    client = client_cls(api_key=api_key, base_url=base_url)
+    _client_cache[key] = (loop, client)
+    return client
+
 
 class AIProvider(ABC):
     """抽象AI供应商接口"""
@@ -36,7 +96,7 @@ class OpenAIProvider(AIProvider):
     """OpenAI供应商实现"""
 
     async def chat(self, model: str, messages: List[Dict[str, str]], api_key: str, **kwargs) -> Dict[str, Any]:
-        client = openai.AsyncOpenAI(api_key=api_key, base_url=kwargs.get('base_url'))
+        client = _get_client(openai.AsyncOpenAI, api_key=api_key, base_url=kwargs.get('base_url'))
 
         response = await client.chat.completions.create(
             model=model,
@@ -66,7 +126,7 @@ class OpenAIProvider(AIProvider):
         **kwargs
     ) -> Dict[str, Any]:
         """支持工具调用的聊天接口"""
-        client = openai.AsyncOpenAI(api_key=api_key, base_url=kwargs.get('base_url'))
+        client = _get_client(openai.AsyncOpenAI, api_key=api_key, base_url=kwargs.get('base_url'))
 
         response = await client.chat.completions.create(
             model=model,
@@ -111,7 +171,7 @@ class AnthropicProvider(AIProvider):
     """Anthropic供应商实现"""
 
     async def chat(self, model: str, messages: List[Dict[str, str]], api_key: str, **kwargs) -> Dict[str, Any]:
-        client = anthropic.AsyncAnthropic(api_key=api_key, base_url=kwargs.get('base_url'))
+        client = _get_client(anthropic.AsyncAnthropic, api_key=api_key, base_url=kwargs.get('base_url'))
 
         # Convert messages to Anthropic format
         system_message = next((m["content"] for m in messages if m["role"] == "system"), None)
@@ -214,7 +274,8 @@ class DeepSeekProvider(AIProvider):
     """DeepSeek供应商实现"""
 
     async def chat(self, model: str, messages: List[Dict[str, str]], api_key: str, **kwargs) -> Dict[str, Any]:
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=kwargs.get('base_url', 'https://api.deepseek.com/v1')
         )
@@ -247,7 +308,8 @@ class DeepSeekProvider(AIProvider):
         **kwargs
     ) -> Dict[str, Any]:
         """DeepSeek 支持 OpenAI 兼容的 tools API"""
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=kwargs.get('base_url', 'https://api.deepseek.com/v1')
         )
@@ -305,7 +367,8 @@ class MoonshotProvider(AIProvider):
         elif base_url == 'international' or base_url is None:
             base_url = 'https://api.moonshot.ai/v1'
 
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=base_url
         )
@@ -344,7 +407,7 @@ class MoonshotProvider(AIProvider):
         elif base_url == 'international' or base_url is None:
             base_url = 'https://api.moonshot.ai/v1'
 
-        client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        client = _get_client(openai.AsyncOpenAI, api_key=api_key, base_url=base_url)
 
         response = await client.chat.completions.create(
             model=model,
@@ -397,7 +460,8 @@ class GLMCodingProvider(AIProvider):
         # GLM 编码套餐专用 API 地址
         base_url = kwargs.get('base_url', 'https://open.bigmodel.cn/api/coding/paas/v4')
 
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=base_url
         )
@@ -430,7 +494,7 @@ class GLMCodingProvider(AIProvider):
         """GLM 编码套餐支持 OpenAI 兼容的 tools API"""
         base_url = kwargs.get('base_url', 'https://open.bigmodel.cn/api/coding/paas/v4')
 
-        client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        client = _get_client(openai.AsyncOpenAI, api_key=api_key, base_url=base_url)
 
         response = await client.chat.completions.create(
             model=model,
@@ -479,7 +543,8 @@ class GLMProvider(AIProvider):
         # GLM 普通版本 API 地址
         base_url = kwargs.get('base_url', 'https://open.bigmodel.cn/api/paas/v4')
 
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=base_url
         )
@@ -512,7 +577,7 @@ class GLMProvider(AIProvider):
         """GLM 普通版本支持 OpenAI 兼容的 tools API"""
         base_url = kwargs.get('base_url', 'https://open.bigmodel.cn/api/paas/v4')
 
-        client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        client = _get_client(openai.AsyncOpenAI, api_key=api_key, base_url=base_url)
 
         response = await client.chat.completions.create(
             model=model,
@@ -558,7 +623,8 @@ class OpenRouterProvider(AIProvider):
     """OpenRouter 供应商实现 - 支持 100+ 模型"""
 
     async def chat(self, model: str, messages: List[Dict[str, str]], api_key: str, **kwargs) -> Dict[str, Any]:
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=kwargs.get('base_url', 'https://openrouter.ai/api/v1')
         )
@@ -588,7 +654,8 @@ class OpenRouterProvider(AIProvider):
         **kwargs
     ) -> Dict[str, Any]:
         """OpenRouter 支持 OpenAI 兼容的 tools API"""
-        client = openai.AsyncOpenAI(
+        client = _get_client(
+            openai.AsyncOpenAI,
             api_key=api_key,
             base_url=kwargs.get('base_url', 'https://openrouter.ai/api/v1')
         )
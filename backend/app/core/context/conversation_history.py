@@ -8,17 +8,37 @@
 - 为后续的状态恢复打基础
 """
 
+import os
+import copy
 import json
+import asyncio
 import logging
 import time
 import uuid
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
+from collections import OrderedDict
+
+from app.core.context.file_io import read_json_file, write_text_file_atomic
 
 logger = logging.getLogger(__name__)
 
 
+# 已解析的历史文件缓存：文件路径 -> (修改时间 ns, 文件大小, task_id, 消息列表)
+# 文件指纹未变化时直接复用解析结果，跳过 JSON 解析和消息反序列化
+_history_cache: "OrderedDict[str, Tuple[int, int, Any, List[ConversationMessage]]]" = OrderedDict()
+_HISTORY_CACHE_MAX_SIZE = 64
+
+
+def _copy_message(message: "ConversationMessage") -> "ConversationMessage":
+    """复制缓存中的消息：消息和工具调用记录都会被原地修改（压缩范围、工具结果），需各自复制"""
+    message = copy.copy(message)
+    if message.tool_calls:
+        message.tool_calls = [copy.copy(tc) for tc in message.tool_calls]
+    return message
+
+
 @dataclass
 class ToolCall:
     """工具调用记录"""
@@ -296,9 +316,6 @@ class ConversationHistoryManager:
             是否保存成功
         """
         try:
-            # 确保任务目录存在
-            self.task_dir.mkdir(parents=True, exist_ok=True)
-
             # 序列化消息
             data = {
                 "task_id": self.task_id,
@@ -309,9 +326,15 @@ class ConversationHistoryManager:
                 "messages": [msg.to_dict() for msg in self.messages],
             }
 
-            # 写入 API 历史文件
-            with open(self.api_history_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 一次性编码为紧凑 JSON：不带 indent 的 dumps 走 C 编码器，
+            # indent / json.dump 会退回纯 Python 的逐块编码
+            payload = json.dumps(data, ensure_ascii=False)
+
+            # 写入 API 历史文件（先使解析缓存失效，文件指纹在同一时间粒度内可能不变）
+            # 建目录和写盘放入线程池，避免大历史文件阻塞事件循环
+            _history_cache.pop(str(self.api_history_file), None)
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, write_text_file_atomic, self.api_history_file, payload)
 
             logger.info(f"对话历史已保存: {self.api_history_file.name} ({len(self.messages)} 条消息)")
             return True
@@ -330,24 +353,42 @@ class ConversationHistoryManager:
             是否加载成功
         """
         try:
-            if not self.api_history_file.exists():
+            # 1. 获取文件指纹（一次 stat 同时判断文件是否存在）
+            try:
+                st = os.stat(self.api_history_file)
+            except FileNotFoundError:
                 logger.info(f"对话历史文件不存在: {self.api_history_file.name}")
                 return False
 
-            # 读取文件
-            with open(self.api_history_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            # 验证 task_id
-            if data.get("task_id") != self.task_id:
-                logger.warning(f"task_id 不匹配: {data.get('task_id')} != {self.task_id}")
+            # 2. 文件未变化时复用缓存的解析结果
+            cache_key = str(self.api_history_file)
+            cached = _history_cache.get(cache_key)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                _history_cache.move_to_end(cache_key)
+                task_id, messages = cached[2], cached[3]
+            else:
+                # 读取并解析文件（磁盘 I/O 和 JSON 解析放入线程池）
+                loop = asyncio.get_event_loop()
+                data = await loop.run_in_executor(None, read_json_file, self.api_history_file)
+
+                # 反序列化消息
+                task_id = data.get("task_id")
+                messages = [
+                    ConversationMessage.from_dict(msg_data)
+                    for msg_data in data.get("messages", [])
+                ]
+
+                _history_cache[cache_key] = (st.st_mtime_ns, st.st_size, task_id, messages)
+                if len(_history_cache) > _HISTORY_CACHE_MAX_SIZE:
+                    _history_cache.popitem(last=False)
+
+            # 3. 验证 task_id
+            if task_id != self.task_id:
+                logger.warning(f"task_id 不匹配: {task_id} != {self.task_id}")
                 return False
 
-            # 反序列化消息
-            self.messages = [
-                ConversationMessage.from_dict(msg_data)
-                for msg_data in data.get("messages", [])
-            ]
+            # 4. 复制每条消息：缓存中的对象不随本实例后续的修改（压缩范围、工具结果）而变化
+            self.messages = [_copy_message(msg) for msg in messages]
 
             logger.info(f"对话历史已加载: {self.api_history_file.name} ({len(self.messages)} 条消息)")
             return True
@@ -0,0 +1,40 @@
+"""
+历史文件读写工具
+
+对话历史和任务历史共用的 JSON 读取与原子写盘函数，均为阻塞调用，
+由调用方通过 run_in_executor 放入线程池执行。
+"""
+
+import os
+import json
+import tempfile
+from typing import Any
+from pathlib import Path
+
+
+def read_json_file(path: Path) -> Any:
+    """读取并解析 JSON 文件"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_text_file_atomic(path: Path, payload: str) -> None:
+    """创建父目录并原子写入文本文件
+
+    先写入同目录下的临时文件并 fsync，再用 os.replace 替换目标文件，
+    写入中途崩溃时保留旧文件，不会留下只写了一半的 JSON
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
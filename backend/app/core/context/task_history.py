@@ -8,11 +8,15 @@
 """
 
 import json
+import asyncio
 import logging
 import time
+from operator import attrgetter
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
+
+from app.core.context.file_io import read_json_file, write_text_file_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +56,12 @@ class HistoryItem:
     repository_path: Optional[str] = None  # Git 仓库路径
 
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        data = asdict(self)
-        return data
+        """转换为字典
+
+        所有字段都是基本类型，直接复制实例字典即可；
+        asdict 会逐字段反射并递归深拷贝，保存较长的任务列表时开销明显
+        """
+        return self.__dict__.copy()
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "HistoryItem":
@@ -108,9 +115,9 @@ class TaskHistoryManager:
                 self.history_items = []
                 return False
 
-            # 读取文件
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # 读取并解析文件（放入线程池，避免任务较多时阻塞事件循环）
+            loop = asyncio.get_event_loop()
+            data = await loop.run_in_executor(None, read_json_file, self.history_file)
 
             # 反序列化
             self.history_items = [
@@ -134,15 +141,15 @@ class TaskHistoryManager:
             是否保存成功
         """
         try:
-            # 确保目录存在
-            self.history_dir.mkdir(parents=True, exist_ok=True)
-
             # 序列化
             data = [item.to_dict() for item in self.history_items]
 
-            # 写入文件
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 一次性编码为紧凑 JSON：不带 indent 的 dumps 走 C 编码器
+            payload = json.dumps(data, ensure_ascii=False)
+
+            # 建目录和原子写盘放入线程池
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, write_text_file_atomic, self.history_file, payload)
 
             logger.info(f"已保存 {len(self.history_items)} 个任务历史")
             return True
@@ -172,32 +179,56 @@ class TaskHistoryManager:
         Returns:
             创建或更新的 HistoryItem
         """
-        # 检查是否已存在
-        existing_item = next(
-            (item for item in self.history_items if item.id == task_id),
-            None
-        )
+        return self.add_or_update_tasks([{
+            "task_id": task_id,
+            "task_description": task_description,
+            "api_provider": api_provider,
+            "api_model": api_model,
+            "repository_path": repository_path,
+        }])[0]
+
+    def add_or_update_tasks(self, specs: List[Dict[str, Any]]) -> List[HistoryItem]:
+        """
+        批量添加或更新任务（add_or_update_task 也经由这里）
+
+        只建立一次 ID 索引、只排序一次，适合一次导入大量任务
 
-        if existing_item:
-            # 更新现有任务
-            existing_item.update_timestamp()
-            return existing_item
-        else:
-            # 创建新任务
-            new_item = HistoryItem(
-                id=task_id,
-                task=task_description,
-                api_provider=api_provider,
-                api_model=api_model,
-                repository_path=repository_path,
-            )
-            self.history_items.append(new_item)
+        Args:
+            specs: 任务参数列表，每项的键与 add_or_update_task 的参数相同
 
+        Returns:
+            与 specs 顺序对应的 HistoryItem 列表
+        """
+        items_by_id = {item.id: item for item in self.history_items}
+        results = []
+        added = 0
+
+        for spec in specs:
+            task_id = spec["task_id"]
+            item = items_by_id.get(task_id)
+
+            if item:
+                item.update_timestamp()
+            else:
+                item = HistoryItem(
+                    id=task_id,
+                    task=spec["task_description"],
+                    api_provider=spec.get("api_provider"),
+                    api_model=spec.get("api_model"),
+                    repository_path=spec.get("repository_path"),
+                )
+                self.history_items.append(item)
+                items_by_id[task_id] = item
+                added += 1
+
+            results.append(item)
+
+        if added:
             # 按时间倒序排序（最新的在前）
-            self.history_items.sort(key=lambda x: x.ts, reverse=True)
+            self.history_items.sort(key=attrgetter("ts"), reverse=True)
+            logger.info(f"添加 {added} 个新任务到历史")
 
-            logger.info(f"添加新任务到历史: {task_id}")
-            return new_item
+        return results
 
     def get_task(self, task_id: str) -> Optional[HistoryItem]:
         """
@@ -247,13 +278,14 @@ class TaskHistoryManager:
                 if query_lower in item.task.lower() or query_lower in item.id.lower()
             ]
 
-        # 排序
+        # 排序（sorted 返回新列表：未过滤时 items 就是 self.history_items，
+        # 原地排序会改变管理器保存的顺序；attrgetter 在 C 层取属性，比 lambda 快）
         if sort_by == "newest":
-            items.sort(key=lambda x: x.ts, reverse=True)
+            items = sorted(items, key=attrgetter("ts"), reverse=True)
         elif sort_by == "oldest":
-            items.sort(key=lambda x: x.ts, reverse=False)
+            items = sorted(items, key=attrgetter("ts"))
         elif sort_by == "cost":
-            items.sort(key=lambda x: x.total_cost, reverse=True)
+            items = sorted(items, key=attrgetter("total_cost"), reverse=True)
 
         # 限制数量
         return items[:limit]
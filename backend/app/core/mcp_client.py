@@ -323,29 +323,40 @@ class MCPClient:
         self._prompts_cache = None
 
     async def _send_request(self, request: JSONRPCRequest) -> JSONRPCResponse:
-        """发送请求并等待响应"""
-        async with self._request_lock:
-            # 创建Future等待响应
-            future: asyncio.Future[JSONRPCResponse] = asyncio.Future()
-            self._pending_requests[request.id] = future
+        """发送请求并等待响应
 
-            try:
+        传输层支持流水线时（stdio/WebSocket），锁只保护写入，响应按请求 ID 匹配，
+        多个请求可以同时在途（如并发的 tools/list 与 resources/list 只需一个往返）；
+        否则（HTTP 只暂存最近一次响应）整个请求-响应往返在锁内串行执行
+        """
+        # 创建Future等待响应（先登记再发送，响应先于等待到达时也不会丢失）
+        future: asyncio.Future[JSONRPCResponse] = asyncio.get_running_loop().create_future()
+        self._pending_requests[request.id] = future
+
+        try:
+            if self.transport.supports_pipelining:
                 # 发送请求
-                await self.transport.send_message(request)
+                async with self._request_lock:
+                    await self.transport.send_message(request)
 
-                # 等待响应
+                # 等待响应（不持有锁）
                 response = await asyncio.wait_for(future, timeout=self.timeout)
-                return response
-
-            except asyncio.TimeoutError:
-                logger.error(f"Request timeout: {request.method}")
-                raise MCPClientError(f"Request timeout: {request.method}")
-            except Exception as e:
-                logger.error(f"Request failed: {e}")
-                raise
-            finally:
-                # 清理pending request
-                self._pending_requests.pop(request.id, None)
+            else:
+                async with self._request_lock:
+                    await self.transport.send_message(request)
+                    response = await asyncio.wait_for(future, timeout=self.timeout)
+
+            return response
+
+        except asyncio.TimeoutError:
+            logger.error(f"Request timeout: {request.method}")
+            raise MCPClientError(f"Request timeout: {request.method}")
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            raise
+        finally:
+            # 清理pending request
+            self._pending_requests.pop(request.id, None)
 
     async def _send_notification(self, notification: JSONRPCNotification) -> None:
         """发送通知（不需要响应）"""
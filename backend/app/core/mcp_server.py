@@ -7,7 +7,7 @@ import json
 import os
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from pathlib import Path
 
 from app.core.config import settings
@@ -32,6 +32,15 @@ class MCPServerManager:
         # 运行中的客户端实例
         self._active_clients: Dict[str, MCPClient] = {}
 
+        # 运行中服务器名称的快照（服务器启动/停止时失效，见 _notify_state_change）
+        self._active_server_names: Optional[Tuple[str, ...]] = None
+
+        # 进行中的启动任务（并发启动同一服务器时共享）
+        self._starting: Dict[str, asyncio.Task] = {}
+
+        # 服务器状态变化监听器（启动/停止/配置变更时以服务器名回调）
+        self._state_listeners: List[Callable[[str], None]] = []
+
         # 加载配置
         self._load_servers()
 
@@ -59,6 +68,26 @@ class MCPServerManager:
         except Exception as e:
             logger.error(f"Error saving MCP servers: {e}")
 
+    def add_state_listener(self, listener: Callable[[str], None]) -> None:
+        """注册服务器状态变化监听器"""
+        self._state_listeners.append(listener)
+
+    def _notify_state_change(self, name: str) -> None:
+        """通知监听器服务器状态已变化"""
+        self._active_server_names = None
+        for listener in self._state_listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.warning(f"MCP state listener failed for {name}: {e}")
+
+    @property
+    def active_server_names(self) -> Tuple[str, ...]:
+        """运行中的服务器名称（不可变快照，迭代期间服务器启动/停止不受影响）"""
+        if self._active_server_names is None:
+            self._active_server_names = tuple(self._active_clients)
+        return self._active_server_names
+
     def add_server(self, name: str, config: Dict[str, Any]) -> bool:
         """添加MCP服务器配置"""
         try:
@@ -88,6 +117,7 @@ class MCPServerManager:
             if name in self.servers:
                 del self.servers[name]
                 self._save_servers()
+                self._notify_state_change(name)
                 logger.info(f"Removed MCP server: {name}")
                 return True
             return False
@@ -120,6 +150,7 @@ class MCPServerManager:
 
                 self.servers[name] = config
                 self._save_servers()
+                self._notify_state_change(name)
                 logger.info(f"Updated MCP server: {name}")
 
                 # 🔥 调试日志：验证内存中的配置已更新
@@ -183,6 +214,7 @@ class MCPServerManager:
 
             # 保存客户端实例
             self._active_clients[name] = client
+            self._notify_state_change(name)
 
             logger.info(f"MCP server started successfully: {name}")
             return True
@@ -194,6 +226,29 @@ class MCPServerManager:
             logger.error(f"Unexpected error starting server {name}: {e}")
             return False
 
+    async def ensure_server_started(self, name: str) -> bool:
+        """
+        确保服务器已启动（按需启动）
+
+        并发调用同一个未启动的服务器时共享同一个启动任务，避免重复启动子进程
+        """
+        if name in self._active_clients:
+            return True
+
+        task = self._starting.get(name)
+        if task is None:
+            task = asyncio.create_task(self.start_server(name))
+            self._starting[name] = task
+
+            def _clear(done: asyncio.Task) -> None:
+                if self._starting.get(name) is done:
+                    del self._starting[name]
+
+            task.add_done_callback(_clear)
+
+        # shield：单个调用方被取消时不影响其他等待者的启动任务
+        return await asyncio.shield(task)
+
     async def stop_server(self, name: str) -> bool:
         """停止MCP服务器"""
         try:
@@ -207,6 +262,7 @@ class MCPServerManager:
 
             # 移除客户端实例
             del self._active_clients[name]
+            self._notify_state_change(name)
 
             logger.info(f"Stopped MCP server: {name}")
             return True
@@ -398,7 +454,7 @@ class MCPServerManager:
             client = self._active_clients.get(server_name)
             if not client:
                 # 尝试启动服务器
-                await self.start_server(server_name)
+                await self.ensure_server_started(server_name)
                 client = self._active_clients.get(server_name)
 
                 if not client:
@@ -554,7 +610,7 @@ class MCPServerManager:
         """停止所有运行中的服务器"""
         tasks = [
             self.stop_server(name)
-            for name in list(self._active_clients.keys())
+            for name in self.active_server_names
         ]
         await asyncio.gather(*tasks, return_exceptions=True)
         logger.info("All MCP servers stopped")
@@ -30,6 +30,9 @@ class MCPTransportError(Exception):
 class MCPTransport(ABC):
     """MCP传输层抽象基类"""
 
+    # 是否支持多个请求同时在途（响应通过请求 ID 异步匹配）
+    supports_pipelining: bool = False
+
     def __init__(self):
         self._message_handler: Optional[Callable[[JSONRPCMessage], Awaitable[None]]] = None
         self._is_connected = False
@@ -81,6 +84,8 @@ class MCPTransport(ABC):
 class MCPStdioTransport(MCPTransport):
     """stdio传输实现（通过子进程通信）"""
 
+    supports_pipelining = True
+
     def __init__(
         self,
         command: str,
@@ -503,6 +508,8 @@ class MCPHttpTransport(MCPTransport):
 class MCPWebSocketTransport(MCPTransport):
     """WebSocket传输实现（双向通信）"""
 
+    supports_pipelining = True
+
     def __init__(
         self,
         url: str,
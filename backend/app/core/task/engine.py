@@ -9,6 +9,7 @@
 """
 
 import json
+import asyncio
 import logging
 import uuid
 from typing import Dict, Any, List, Optional, AsyncIterator
@@ -59,6 +60,9 @@ class TaskEngine:
         self.prompt_builder = PromptBuilder(self.tool_coordinator)
         # 🔥 移除这里的 tools_definition 初始化，改为每次执行任务时动态获取
         # self.tools_definition = tools_to_openai_functions(self.tool_coordinator)
+        # 工具定义按工具集版本号缓存：工具注册/注销后版本号变化，下次调用时重新转换
+        self._tools_definition: List[Dict[str, Any]] = []
+        self._tools_definition_version: Optional[int] = None
 
         # 上下文管理
         self.token_counter = TokenCounter()
@@ -102,17 +106,18 @@ class TaskEngine:
         if is_new_task:
             task_id = str(uuid.uuid4())[:8]
 
-        print("\n" + "="*80)
-        if is_new_task:
-            print(f"🚀 开始执行任务")
-        else:
-            print(f"🔄 继续任务 (记忆模式)")
-        print("="*80)
-        print(f"📝 用户输入: {user_input}")
-        print(f"📁 仓库路径: {repository_path}")
-        print(f"🆔 任务 ID: {task_id}")
-        print(f"🤖 AI 配置: {ai_config.get('ai_provider')} - {ai_config.get('ai_model')}")
-        print("="*80 + "\n")
+        # 多行状态信息合并为一次 print，减少逐行写入和刷新
+        title = "🚀 开始执行任务" if is_new_task else "🔄 继续任务 (记忆模式)"
+        print(
+            f"\n{'='*80}\n"
+            f"{title}\n"
+            f"{'='*80}\n"
+            f"📝 用户输入: {user_input}\n"
+            f"📁 仓库路径: {repository_path}\n"
+            f"🆔 任务 ID: {task_id}\n"
+            f"🤖 AI 配置: {ai_config.get('ai_provider')} - {ai_config.get('ai_model')}\n"
+            f"{'='*80}\n"
+        )
 
         logger.info(f"=== {'开始新任务' if is_new_task else '继续任务'} (ID: {task_id}) ===")
         logger.info(f"用户输入: {user_input[:100]}...")
@@ -192,9 +197,7 @@ class TaskEngine:
             async for event in self._task_loop(user_content, context, ai_config):
                 yield event
         except Exception as e:
-            print(f"\n{'='*80}")
-            print(f"❌ 任务执行失败: {e}")
-            print(f"{'='*80}\n")
+            print(f"\n{'='*80}\n❌ 任务执行失败: {e}\n{'='*80}\n")
             logger.error(f"任务执行失败: {e}", exc_info=True)
             yield {
                 "type": "error",
@@ -208,11 +211,13 @@ class TaskEngine:
                 success = await self.history_manager.save_history()
                 if success:
                     stats = self.history_manager.get_stats()
-                    print(f"\n💾 对话历史已保存:")
-                    print(f"   - 总消息数: {stats['total_messages']}")
-                    print(f"   - 用户消息: {stats['user_messages']}")
-                    print(f"   - AI 消息: {stats['assistant_messages']}")
-                    print(f"   - 总 tokens: {stats['total_tokens']}")
+                    print(
+                        f"\n💾 对话历史已保存:\n"
+                        f"   - 总消息数: {stats['total_messages']}\n"
+                        f"   - 用户消息: {stats['user_messages']}\n"
+                        f"   - AI 消息: {stats['assistant_messages']}\n"
+                        f"   - 总 tokens: {stats['total_tokens']}"
+                    )
 
             # 更新并保存任务历史统计
             if self.task_history_manager:
@@ -228,9 +233,7 @@ class TaskEngine:
                 # 保存任务历史列表
                 await self.task_history_manager.save_history()
 
-        print("\n" + "="*80)
-        print("✅ 任务执行完成")
-        print("="*80 + "\n")
+        print(f"\n{'='*80}\n✅ 任务执行完成\n{'='*80}\n")
 
         logger.info(f"=== 任务结束 ===")
 
@@ -272,9 +275,7 @@ class TaskEngine:
                 }
                 break
 
-            print(f"\n{'─'*80}")
-            print(f"🔄 迭代 {iteration}/{self.max_iterations}")
-            print(f"{'─'*80}\n")
+            print(f"\n{'─'*80}\n🔄 迭代 {iteration}/{self.max_iterations}\n{'─'*80}\n")
 
             logger.info(f"=== 迭代 {iteration} ===")
 
@@ -321,9 +322,11 @@ class TaskEngine:
         # 3. 调用 AI（使用 Tools API）
         self.task_state.increment_api_request_count()
 
-        print(f"📤 发送 API 请求...")
-        print(f"   - 消息数量: {len(messages)}")
-        print(f"   - 系统提示词长度: {len(system_prompt)} 字符")
+        print(
+            f"📤 发送 API 请求...\n"
+            f"   - 消息数量: {len(messages)}\n"
+            f"   - 系统提示词长度: {len(system_prompt)} 字符"
+        )
 
         yield {
             "type": "api_request_started",
@@ -341,9 +344,11 @@ class TaskEngine:
             assistant_content = response.get("content", "")
             tool_calls_api = response.get("tool_calls", [])
 
-            print(f"📥 收到 AI 响应")
-            print(f"   - 响应内容长度: {len(assistant_content)} 字符")
-            print(f"   - 工具调用数量: {len(tool_calls_api)}")
+            print(
+                f"📥 收到 AI 响应\n"
+                f"   - 响应内容长度: {len(assistant_content)} 字符\n"
+                f"   - 工具调用数量: {len(tool_calls_api)}"
+            )
 
             if assistant_content:
                 preview = assistant_content[:100] + "..." if len(assistant_content) > 100 else assistant_content
@@ -413,15 +418,17 @@ class TaskEngine:
                 return
 
             # 8. 执行工具
-            print(f"\n🔧 检测到 {len(tool_calls)} 个工具调用:")
+            output_lines = [f"\n🔧 检测到 {len(tool_calls)} 个工具调用:"]
 
             for i, tc in enumerate(tool_calls, 1):
                 tool_name = tc["name"]
                 params = tc["parameters"]
-                print(f"   {i}. {tool_name}")
+                output_lines.append(f"   {i}. {tool_name}")
                 if params:
                     params_str = ", ".join([f"{k}={v}" for k, v in params.items()])
-                    print(f"      参数: {params_str}")
+                    output_lines.append(f"      参数: {params_str}")
+
+            print("\n".join(output_lines))
 
             yield {
                 "type": "tool_calls_detected",
@@ -432,53 +439,75 @@ class TaskEngine:
             # 9. 执行所有工具调用
             tool_results = []
             has_completion_tool = False
+            # 已提前启动的只读工具：索引 -> 执行任务
+            started_tools: Dict[int, asyncio.Task] = {}
+
+            try:
+                for index, tool_call_dict in enumerate(tool_calls):
+                    tool_name = tool_call_dict.get("name")
+
+                    # 检查是否是 attempt_completion 工具
+                    if tool_name == "attempt_completion":
+                        has_completion_tool = True
+
+                    # 执行工具（从这里开始的连续只读工具一起并发启动）
+                    if index not in started_tools:
+                        started_run = self._start_read_only_tools(tool_calls, index, context)
+                        started_tools.update(started_run)
+
+                        # 流式返回工具执行进度：提前启动的只读工具在创建任务时一并通知
+                        for started_index in (started_run or [index]):
+                            started_name = tool_calls[started_index].get("name")
+                            print(f"\n⚙️  执行工具: {started_name}")
+                            yield {
+                                "type": "tool_execution_started",
+                                "tool_name": started_name,
+                                "iteration": iteration
+                            }
+
+                    task = started_tools.pop(index, None)
+                    if task is not None:
+                        result = await task
+                    else:
+                        result = await self._execute_tool(tool_call_dict, context)
+
+                    # 打印执行结果
+                    if result["success"]:
+                        print(f"   ✅ 工具执行成功")
+                        data = result.get("data")
+                        if data:
+                            data_str = str(data)
+                            if len(data_str) > 200:
+                                print(f"   📊 结果: {data_str[:200]}...")
+                            else:
+                                print(f"   📊 结果: {data_str}")
+                    else:
+                        print(f"   ❌ 工具执行失败: {result.get('error', 'Unknown error')}")
 
-            for tool_call_dict in tool_calls:
-                tool_name = tool_call_dict.get("name")
-                print(f"\n⚙️  执行工具: {tool_name}")
-
-                # 检查是否是 attempt_completion 工具
-                if tool_name == "attempt_completion":
-                    has_completion_tool = True
-
-                # 流式返回工具执行进度
-                yield {
-                    "type": "tool_execution_started",
-                    "tool_name": tool_name,
-                    "iteration": iteration
-                }
-
-                # 执行工具
-                result = await self._execute_tool(tool_call_dict, context)
-
-                # 打印执行结果
-                if result["success"]:
-                    print(f"   ✅ 工具执行成功")
-                    data = result.get("data")
-                    if data:
-                        data_str = str(data)
-                        if len(data_str) > 200:
-                            print(f"   📊 结果: {data_str[:200]}...")
-                        else:
-                            print(f"   📊 结果: {data_str}")
-                else:
-                    print(f"   ❌ 工具执行失败: {result.get('error', 'Unknown error')}")
-
-                yield {
-                    "type": "tool_execution_completed",
-                    "tool_name": tool_name,
-                    "result": result,
-                    "iteration": iteration
-                }
-
-                tool_results.append(result)
+                    yield {
+                        "type": "tool_execution_completed",
+                        "tool_name": tool_name,
+                        "result": result,
+                        "iteration": iteration
+                    }
 
-                # 更新历史记录中的工具结果
-                if self.history_manager and self.history_manager.messages:
-                    last_message = self.history_manager.messages[-1]
-                    if last_message.tool_calls and len(last_message.tool_calls) >= len(tool_results):
-                        tool_call_index = len(tool_results) - 1
-                        last_message.tool_calls[tool_call_index].result = result
+                    tool_results.append(result)
+
+                    # 更新历史记录中的工具结果
+                    if self.history_manager and self.history_manager.messages:
+                        last_message = self.history_manager.messages[-1]
+                        if last_message.tool_calls and len(last_message.tool_calls) >= len(tool_results):
+                            tool_call_index = len(tool_results) - 1
+                            last_message.tool_calls[tool_call_index].result = result
+            finally:
+                # 生成器被关闭/取消或前面的工具出错时，取消并回收尚未消费的提前启动任务，
+                # 避免工具 I/O 在请求结束后继续运行并产生 "Task exception was never retrieved"
+                if started_tools:
+                    pending = list(started_tools.values())
+                    started_tools.clear()
+                    for pending_task in pending:
+                        pending_task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
 
             # 10. 检查是否调用了 attempt_completion
             if has_completion_tool:
@@ -684,6 +713,14 @@ class TaskEngine:
             logger.error(f"AI 调用失败: {e}", exc_info=True)
             return None
 
+    def _get_tools_definition(self) -> List[Dict[str, Any]]:
+        """获取 OpenAI Tools 格式的工具定义（工具集未变化时复用上次的转换结果）"""
+        version = self.tool_coordinator.version
+        if version != self._tools_definition_version:
+            self._tools_definition = tools_to_openai_functions(self.tool_coordinator)
+            self._tools_definition_version = version
+        return self._tools_definition
+
     async def _call_ai_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -693,7 +730,7 @@ class TaskEngine:
         """调用 AI（使用 Tools API）"""
         try:
             # 🔥 每次调用 AI 时动态获取最新的工具定义（支持运行时添加/删除 MCP 工具）
-            tools_definition = tools_to_openai_functions(self.tool_coordinator)
+            tools_definition = self._get_tools_definition()
 
             response = await self.ai_manager.chat_with_tools(
                 provider=ai_config["ai_provider"],
@@ -740,6 +777,28 @@ class TaskEngine:
             "error": result.error
         }
 
+    def _start_read_only_tools(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        start: int,
+        context: ToolContext
+    ) -> Dict[int, asyncio.Task]:
+        """并发启动从 start 开始的连续只读工具
+
+        只读工具互不影响，可以同时执行；遇到非只读工具即停止，
+        保证写入类工具之后的调用能看到它的修改
+
+        Returns:
+            索引 -> 执行任务（start 处不是只读工具时为空）
+        """
+        tasks = {}
+        for index in range(start, len(tool_calls)):
+            tool_call_dict = tool_calls[index]
+            if not self.tool_coordinator.is_read_only(tool_call_dict.get("name")):
+                break
+            tasks[index] = asyncio.ensure_future(self._execute_tool(tool_call_dict, context))
+        return tasks
+
     def _format_tool_results_for_ai(self, results: List[Dict[str, Any]]) -> str:
         """格式化工具结果用于 AI 理解（使用 XML 格式）"""
         formatted = []
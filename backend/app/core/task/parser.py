@@ -14,6 +14,14 @@ from typing import List, Dict, Any, Optional
 logger = logging.getLogger(__name__)
 
 
+# 模块级预编译的正则（每轮 AI 响应都会解析，避免每次调用时查找 re 模块的编译缓存）
+_TOOL_BLOCK_PATTERN = re.compile(r'```tool\s*\n(.*?)```', re.DOTALL)
+_JSON_BLOCK_PATTERN = re.compile(r'```json\s*\n(.*?)```', re.DOTALL)
+# 匹配 { "name": "...", "parameters": {...} }
+_DIRECT_JSON_PATTERN = re.compile(r'\{\s*"name"\s*:\s*"[^"]+"\s*,\s*"parameters"\s*:\s*\{[^}]*\}\s*\}')
+_TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+
+
 class ToolCallParser:
     """工具调用解析器"""
 
@@ -49,9 +57,12 @@ class ToolCallParser:
         """从 ```tool 代码块中提取"""
         tool_calls = []
 
+        # 快速路径：不含代码块标记时跳过正则扫描
+        if '```tool' not in response:
+            return tool_calls
+
         # 匹配 ```tool ... ``` 代码块
-        pattern = r'```tool\s*\n(.*?)```'
-        matches = re.findall(pattern, response, re.DOTALL)
+        matches = _TOOL_BLOCK_PATTERN.findall(response)
 
         for match in matches:
             tool_calls.extend(self._parse_tool_call_text(match))
@@ -62,9 +73,12 @@ class ToolCallParser:
         """从 ```json 代码块中提取"""
         tool_calls = []
 
+        # 快速路径：不含代码块标记时跳过正则扫描
+        if '```json' not in response:
+            return tool_calls
+
         # 匹配 ```json ... ``` 代码块
-        pattern = r'```json\s*\n(.*?)```'
-        matches = re.findall(pattern, response, re.DOTALL)
+        matches = _JSON_BLOCK_PATTERN.findall(response)
 
         for match in matches:
             tool_calls.extend(self._parse_tool_call_text(match))
@@ -75,10 +89,12 @@ class ToolCallParser:
         """直接从文本中提取 JSON 对象"""
         tool_calls = []
 
+        # 快速路径：模式要求字面量 "name"，不含时不可能匹配
+        if '"name"' not in response:
+            return tool_calls
+
         # 尝试找到 JSON 对象模式
-        # 匹配 { "name": "...", "parameters": {...} }
-        pattern = r'\{\s*"name"\s*:\s*"[^"]+"\s*,\s*"parameters"\s*:\s*\{[^}]*\}\s*\}'
-        matches = re.findall(pattern, response)
+        matches = _DIRECT_JSON_PATTERN.findall(response)
 
         for match in matches:
             try:
@@ -120,7 +136,7 @@ class ToolCallParser:
         # 方法 2: 处理尾随逗号
         try:
             # 移除尾随逗号
-            cleaned = re.sub(r',\s*([}\]])', r'\1', text)
+            cleaned = _TRAILING_COMMA_PATTERN.sub(r'\1', text)
             return json.loads(cleaned)
         except json.JSONDecodeError:
             pass
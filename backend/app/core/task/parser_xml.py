@@ -10,6 +10,20 @@ from typing import List, Dict, Any, Optional
 logger = logging.getLogger(__name__)
 
 
+# 常见的工具名称及其预编译的标签正则（模块加载时编译一次）
+_TOOL_PATTERNS = tuple(
+    (tool_name, f"<{tool_name}>", re.compile(rf"<{tool_name}>(.*?)</{tool_name}>", re.DOTALL))
+    for tool_name in (
+        "read_file", "list_files", "write_to_file", "replace_in_file",
+        "git_status", "git_log", "git_diff", "git_branch",
+        "search_files", "list_code_definitions"
+    )
+)
+
+# 匹配所有参数标签：<param_name>value</param_name>
+_PARAMETER_PATTERN = re.compile(r"<(\w+)>([^<]+)</\1>")
+
+
 class XMLToolCallParser:
     """XML 格式的工具调用解析器（Cline 风格）"""
 
@@ -25,17 +39,13 @@ class XMLToolCallParser:
         """
         tool_calls = []
 
-        # 常见的工具名称模式
-        tool_names = [
-            "read_file", "list_files", "write_to_file", "replace_in_file",
-            "git_status", "git_log", "git_diff", "git_branch",
-            "search_files", "list_code_definitions"
-        ]
+        for tool_name, open_tag, pattern in _TOOL_PATTERNS:
+            # 快速路径：响应中没有该工具的开始标签时跳过正则扫描
+            if open_tag not in response:
+                continue
 
-        for tool_name in tool_names:
             # 匹配 XML 标签格式的工具调用
-            pattern = rf"<{tool_name}>(.*?)</{tool_name}>"
-            matches = re.findall(pattern, response, re.DOTALL)
+            matches = pattern.findall(response)
 
             for match in matches:
                 # 提取参数
@@ -55,8 +65,7 @@ class XMLToolCallParser:
         parameters = {}
 
         # 匹配所有参数标签：<param_name>value</param_name>
-        pattern = r"<(\w+)>([^<]+)</\1>"
-        matches = re.findall(pattern, xml_content)
+        matches = _PARAMETER_PATTERN.findall(xml_content)
 
         for param_name, param_value in matches:
             # 清理值（去除空白字符）
@@ -19,6 +19,10 @@ class PromptBuilder:
 
     def __init__(self, tool_coordinator: ToolCoordinator):
         self.tool_coordinator = tool_coordinator
+        # 上次生成的提示词缓存：(工具集版本号, 仓库路径) -> 提示词
+        # 同一任务的每一轮对话都会重新构建提示词，工具集和仓库不变时内容完全相同
+        self._prompt_cache_key = None
+        self._prompt_cache: str = ""
         # 🔥 调试日志：记录初始化时的 tool_coordinator 状态
         tools_count = len(self.tool_coordinator.list_tools())
         logger.info(f"🔧 PromptBuilder.__init__: tool_coordinator id={id(tool_coordinator)}, 工具数量={tools_count}")
@@ -29,12 +33,17 @@ class PromptBuilder:
 
         🔥 参考 Cline：动态包含所有 MCP 工具定义，AI 可以直接调用，无需中间步骤
         """
-        # 获取工具描述（包括所有静态工具和动态 MCP 工具）
-        tools_description = self._build_tools_description()
-
         # 获取仓库路径
         repo_path = getattr(context, 'repository_path', 'N/A')
 
+        # 工具集和仓库都未变化时直接复用上次的提示词
+        cache_key = (self.tool_coordinator.version, repo_path)
+        if cache_key == self._prompt_cache_key:
+            return self._prompt_cache
+
+        # 获取工具描述（包括所有静态工具和动态 MCP 工具）
+        tools_description = self._build_tools_description()
+
         # 构建基础提示词
         prompt = f"""# Git AI Core - AI驱动的Git项目智能分析助手
 
@@ -154,6 +163,8 @@ class PromptBuilder:
 
 现在请根据用户的需求，完成相应的任务。
 """
+        self._prompt_cache_key = cache_key
+        self._prompt_cache = prompt
         return prompt
 
     def _build_tools_description(self) -> str:
@@ -3,6 +3,8 @@
 借鉴 Cline 的工具架构，提供统一的工具接口
 """
 
+import os
+import functools
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 from enum import Enum
@@ -73,3 +75,19 @@ class ToolContext(BaseModel):
 
     class Config:
         arbitrary_types_allowed = True
+
+    @functools.cached_property
+    def abs_repo_path(self) -> str:
+        """仓库的绝对路径（首次访问时计算，同一上下文内的工具调用共享）"""
+        return os.path.abspath(self.repository_path)
+
+    def resolve_repo_path(self, path: str) -> Optional[str]:
+        """将相对仓库的路径规范化为绝对路径，路径不在仓库内时返回 None
+
+        前缀比较带上路径分隔符，避免 /repo_other 被误认为在 /repo 之内
+        """
+        abs_repo = self.abs_repo_path
+        full_path = os.path.normpath(os.path.join(abs_repo, path))
+        if full_path != abs_repo and not full_path.startswith(abs_repo.rstrip(os.sep) + os.sep):
+            return None
+        return full_path
@@ -19,6 +19,13 @@ class ToolCoordinator:
     def __init__(self):
         self.handlers: Dict[str, BaseToolHandler] = {}
         self._initialized = False
+        # 工具集版本号：每次注册/注销时递增，供依赖工具列表的缓存判断是否失效
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """工具集版本号（工具注册或注销后变化）"""
+        return self._version
 
     def register(self, handler: BaseToolHandler):
         """注册工具处理器
@@ -28,8 +35,23 @@ class ToolCoordinator:
         """
         tool_name = handler.name
         self.handlers[tool_name] = handler
+        self._version += 1
         logger.info(f"注册工具: {tool_name}")
 
+    def register_many(self, handlers: List[BaseToolHandler]):
+        """批量注册工具处理器
+
+        一次性更新处理器表并只输出一条日志，适合一次注册大量动态工具
+
+        Args:
+            handlers: 工具处理器实例列表
+        """
+        if not handlers:
+            return
+        self.handlers.update((handler.name, handler) for handler in handlers)
+        self._version += 1
+        logger.info(f"批量注册 {len(handlers)} 个工具")
+
     def unregister(self, tool_name: str):
         """注销工具处理器
 
@@ -38,6 +60,7 @@ class ToolCoordinator:
         """
         if tool_name in self.handlers:
             del self.handlers[tool_name]
+            self._version += 1
             logger.info(f"注销工具: {tool_name}")
 
     def has(self, tool_name: str) -> bool:
@@ -62,6 +85,18 @@ class ToolCoordinator:
         """
         return self.handlers.get(tool_name)
 
+    def is_read_only(self, tool_name: str) -> bool:
+        """检查工具是否为只读工具（可与相邻的只读工具并发执行）
+
+        Args:
+            tool_name: 工具名称
+
+        Returns:
+            是否只读，工具不存在返回 False
+        """
+        handler = self.handlers.get(tool_name)
+        return handler is not None and handler.read_only
+
     async def execute(self, tool_call: ToolCall, context: ToolContext) -> ToolResult:
         """执行工具调用
 
@@ -111,7 +146,7 @@ class ToolCoordinator:
         Returns:
             工具规范列表
         """
-        return [handler.get_spec() for handler in self.handlers.values()]
+        return [handler.spec for handler in self.handlers.values()]
 
     def list_tools_by_category(self, category: str) -> List[ToolSpec]:
         """按类别列出工具
@@ -123,9 +158,9 @@ class ToolCoordinator:
             该类别的工具规范列表
         """
         return [
-            handler.get_spec()
+            handler.spec
             for handler in self.handlers.values()
-            if handler.get_spec().category == category
+            if handler.spec.category == category
         ]
 
     def get_tools_description(self) -> str:
@@ -13,9 +13,23 @@ from .base import ToolSpec, ToolResult, ToolContext, ToolCall
 logger = logging.getLogger(__name__)
 
 
+# 参数类型 -> Python 类型（模块级常量，参数校验时不必每次重新构建）
+_PARAM_TYPE_MAPPING = {
+    "string": str,
+    "integer": int,
+    "float": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict
+}
+
+
 class BaseToolHandler(ABC):
     """工具处理器基类"""
 
+    # 只读工具（不修改仓库和外部状态），相邻的只读工具调用可以并发执行
+    read_only: bool = False
+
     def __init__(self):
         self._spec: ToolSpec = None
 
@@ -30,6 +44,18 @@ class BaseToolHandler(ABC):
         """获取工具规范"""
         pass
 
+    @property
+    def spec(self) -> ToolSpec:
+        """工具规范（首次访问时调用 get_spec 构建，之后复用同一实例）
+
+        工具规范在处理器生命周期内不变，每次请求都要参数校验和生成工具列表，
+        缓存后不必重复构建 ToolSpec/ToolParameter 对象。
+        """
+        spec = getattr(self, '_spec', None)
+        if spec is None:
+            spec = self._spec = self.get_spec()
+        return spec
+
     @abstractmethod
     async def execute(self, parameters: Any, context: ToolContext) -> Any:
         """执行工具
@@ -58,7 +84,7 @@ class BaseToolHandler(ABC):
         Raises:
             ValueError: 参数验证失败
         """
-        spec = self.get_spec()
+        spec = self.spec
 
         # 检查必需参数
         for param_name, param_def in spec.parameters.items():
@@ -77,16 +103,7 @@ class BaseToolHandler(ABC):
 
     def _check_type(self, value: Any, expected_type: str) -> bool:
         """检查值类型"""
-        type_mapping = {
-            "string": str,
-            "integer": int,
-            "float": float,
-            "boolean": bool,
-            "array": list,
-            "object": dict
-        }
-
-        expected_python_type = type_mapping.get(expected_type)
+        expected_python_type = _PARAM_TYPE_MAPPING.get(expected_type)
         if not expected_python_type:
             return True  # 未知类型，跳过检查
 
@@ -111,6 +128,11 @@ class BaseToolHandler(ABC):
             # 执行工具
             result = await self.execute(validated_params, context)
 
+            # 处理器已返回完整的 ToolResult（如 MCP 工具），直接透传，避免二次包装
+            if isinstance(result, ToolResult):
+                logger.info(f"工具 {tool_call.name} 执行完成: success={result.success}")
+                return result
+
             logger.info(f"工具 {tool_call.name} 执行成功")
             return ToolResult(success=True, data=result)
 
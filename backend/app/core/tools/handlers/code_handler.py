@@ -5,7 +5,8 @@
 
 import os
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from collections import OrderedDict
 import logging
 
 from ..base import ToolSpec, ToolParameter, ToolContext
@@ -15,9 +16,22 @@ from ..handler import BaseToolHandler
 logger = logging.getLogger(__name__)
 
 
+# 代码定义提取结果缓存：文件绝对路径 -> (修改时间 ns, 文件大小, 定义列表)
+# 对话中常反复分析同一文件，文件未变化时直接返回上次的结果
+_definitions_cache: "OrderedDict[str, Tuple[int, int, List[Dict[str, Any]]]]" = OrderedDict()
+_DEFINITIONS_CACHE_MAX_SIZE = 1024
+
+# Python 定义模式（模块加载时编译一次）
+_PY_CLASS_PATTERN = re.compile(r'^\s*(class)\s+(\w+)(?:\s*\([^)]*\))?:')
+_PY_FUNCTION_PATTERN = re.compile(r'^\s*(def)\s+(\w+)\s*\([^)]*\):')
+_PY_DECORATOR_PATTERN = re.compile(r'^@\w+')
+
+
 class ListCodeDefinitionsToolHandler(BaseToolHandler):
     """列出代码定义名称工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "list_code_definitions"
@@ -46,17 +60,29 @@ class ListCodeDefinitionsToolHandler(BaseToolHandler):
         full_path = os.path.join(repo_path, file_path)
 
         # 安全检查
-        if not os.path.abspath(full_path).startswith(os.path.abspath(repo_path)):
+        abs_path = context.resolve_repo_path(file_path)
+        if abs_path is None:
             raise ValueError(f"非法文件路径: {file_path}")
 
-        if not os.path.exists(full_path):
+        # 一次 stat 同时判断文件是否存在并取得缓存指纹
+        try:
+            st = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
             raise ValueError(f"文件不存在: {file_path}")
 
         # 获取文件扩展名
         _, ext = os.path.splitext(file_path)
 
-        # 根据语言选择解析器
-        definitions = self._extract_definitions(full_path, ext)
+        # 文件未变化时复用上次的提取结果，否则根据语言选择解析器
+        cached = _definitions_cache.get(abs_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _definitions_cache.move_to_end(abs_path)
+            definitions = cached[2]
+        else:
+            definitions = self._extract_definitions(full_path, ext)
+            _definitions_cache[abs_path] = (st.st_mtime_ns, st.st_size, definitions)
+            if len(_definitions_cache) > _DEFINITIONS_CACHE_MAX_SIZE:
+                _definitions_cache.popitem(last=False)
 
         return {
             "file_path": file_path,
@@ -125,25 +151,25 @@ class ListCodeDefinitionsToolHandler(BaseToolHandler):
         definitions = []
         lines = content.split('\n')
 
-        # Python 定义模式
-        class_pattern = re.compile(r'^\s*(class)\s+(\w+)(?:\s*\([^)]*\))?:')
-        function_pattern = re.compile(r'^\s*(def)\s+(\w+)\s*\([^)]*\):')
-        decorator_pattern = re.compile(r'^@\w+')
-
         indent_stack = [0]  # 缩进栈，用于判断顶级定义
         current_decorators = []
 
         for line_num, line in enumerate(lines, 1):
             # 检查装饰器
-            decorator_match = decorator_pattern.match(line)
-            if decorator_match:
-                current_decorators.append(line.strip())
+            if line.startswith('@'):
+                if _PY_DECORATOR_PATTERN.match(line):
+                    current_decorators.append(line.strip())
+                    continue
+
+            # 快速跳过：定义行去掉缩进后必然以 class/def 开头，其余行无需运行正则
+            stripped = line.lstrip()
+            if not stripped.startswith(('class', 'def')):
                 continue
 
             # 检查类定义
-            class_match = class_pattern.match(line)
+            class_match = _PY_CLASS_PATTERN.match(line)
             if class_match:
-                indent = len(line) - len(line.lstrip())
+                indent = len(line) - len(stripped)
 
                 # 只收集顶级定义（缩进为 0 或最小）
                 if indent == 0:
@@ -158,9 +184,9 @@ class ListCodeDefinitionsToolHandler(BaseToolHandler):
                 continue
 
             # 检查函数定义
-            function_match = function_pattern.match(line)
+            function_match = _PY_FUNCTION_PATTERN.match(line)
             if function_match:
-                indent = len(line) - len(line.lstrip())
+                indent = len(line) - len(stripped)
 
                 # 只收集顶级定义和类方法（缩进为 0 或 4/8）
                 if indent == 0 or indent in [4, 8]:
@@ -3,8 +3,10 @@
 """
 
 import os
+import stat
 import time
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
 from ..base import ToolSpec, ToolParameter, ToolContext, ToolResult
@@ -44,9 +46,31 @@ def _set_list_cache(cache_key: str, result: Dict[str, Any]) -> None:
     _list_cache[cache_key] = (result, time.time())
 
 
+def _read_text_with_fallback(full_path: str, max_chars: int) -> Tuple[Optional[str], Optional[str]]:
+    """依次尝试 UTF-8 / latin-1 解码读取文件（在线程池中执行）
+
+    Args:
+        full_path: 文件绝对路径
+        max_chars: 最多读取的字符数，0 或负数表示读取全部
+
+    Returns:
+        (内容, 使用的编码)，所有编码都失败时为 (None, None)
+    """
+    for encoding in ('utf-8', 'latin-1'):
+        try:
+            with open(full_path, 'r', encoding=encoding) as f:
+                content = f.read(max_chars) if max_chars > 0 else f.read()
+            return content, encoding
+        except UnicodeDecodeError:
+            continue
+    return None, None
+
+
 class FileReadToolHandler(BaseToolHandler):
     """文件读取工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "read_file"
@@ -98,18 +122,19 @@ class FileReadToolHandler(BaseToolHandler):
         full_path = os.path.join(repo_path, file_path)
 
         # 安全检查：确保文件在仓库内
-        if not os.path.abspath(full_path).startswith(os.path.abspath(repo_path)):
+        if context.resolve_repo_path(file_path) is None:
             raise ValueError(f"非法文件路径: {file_path}")
 
-        # 检查文件是否存在
-        if not os.path.exists(full_path):
+        # 检查文件是否存在（一次 stat 同时得到类型和大小）
+        try:
+            file_stats = os.stat(full_path)
+        except OSError:
             raise ValueError(f"文件不存在: {file_path}")
 
-        if not os.path.isfile(full_path):
+        if not stat.S_ISREG(file_stats.st_mode):
             raise ValueError(f"不是文件: {file_path}")
 
         # 文件大小检查
-        file_stats = os.stat(full_path)
         file_size = file_stats.st_size
 
         # 如果文件过大，给出警告并截断
@@ -120,23 +145,11 @@ class FileReadToolHandler(BaseToolHandler):
 
         # 读取文件内容
         try:
-            # 优化编码检测顺序
-            encodings = ['utf-8', 'latin-1']
-            content = None
-            used_encoding = None
-
-            for encoding in encodings:
-                try:
-                    with open(full_path, 'r', encoding=encoding) as f:
-                        if max_size > 0 and file_size > max_size:
-                            # 只读取指定字节数
-                            content = f.read(max_size)
-                        else:
-                            content = f.read()
-                    used_encoding = encoding
-                    break
-                except UnicodeDecodeError:
-                    continue
+            # 磁盘读取和解码放入线程池，大文件不阻塞事件循环，相邻的只读工具可以并发执行
+            loop = asyncio.get_event_loop()
+            content, used_encoding = await loop.run_in_executor(
+                None, _read_text_with_fallback, full_path, max_size if is_truncated else 0
+            )
 
             if content is None:
                 raise ValueError(f"无法解码文件: {file_path}")
@@ -167,6 +180,8 @@ class FileReadToolHandler(BaseToolHandler):
 class FileListToolHandler(BaseToolHandler):
     """文件列表工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "list_files"
@@ -241,6 +256,7 @@ class FileListToolHandler(BaseToolHandler):
 
         # 标准化路径输入 - 支持 "/"、""、"." 表示根目录
         if not directory or directory in ["/", ".", "./"]:
+            normalized_dir = ""
             full_path = repo_path
         else:
             # 移除前导的 "/" 或 "./"
@@ -249,9 +265,7 @@ class FileListToolHandler(BaseToolHandler):
 
         # 安全检查
         try:
-            abs_path = os.path.abspath(full_path)
-            abs_repo = os.path.abspath(repo_path)
-            if not abs_path.startswith(abs_repo):
+            if context.resolve_repo_path(normalized_dir) is None:
                 raise ValueError(f"非法目录路径: {directory}")
         except Exception as e:
             raise ValueError(f"路径验证失败: {e}")
@@ -262,16 +276,16 @@ class FileListToolHandler(BaseToolHandler):
         if not os.path.isdir(full_path):
             raise ValueError(f"不是目录: {directory}")
 
-        # 列出文件
+        # 列出文件（目录遍历放入线程池，大仓库递归列出时不阻塞事件循环）
+        loop = asyncio.get_event_loop()
         if recursive:
-            items = self._list_directory_recursive(
-                full_path,
-                repo_path,
-                max_depth=max_depth,
-                max_results=max_results
+            items = await loop.run_in_executor(
+                None, self._list_directory_recursive, full_path, repo_path, max_depth, max_results
             )
         else:
-            items = self._list_directory_flat(full_path, repo_path, max_results=max_results)
+            items = await loop.run_in_executor(
+                None, self._list_directory_flat, full_path, repo_path, max_results
+            )
 
         # 计算耗时
         elapsed_time = (time.time() - start_time) * 1000  # 转换为毫秒
@@ -295,21 +309,23 @@ class FileListToolHandler(BaseToolHandler):
     def _list_directory_flat(self, full_path: str, repo_path: str, max_results: int = 1000) -> list:
         """平铺列出目录"""
         items = []
+        # 相对路径前缀只计算一次（relpath 每次都要对两个路径做 abspath）
+        relative_dir = os.path.relpath(full_path, repo_path)
         try:
-            for entry in os.listdir(full_path):
-                if max_results > 0 and len(items) >= max_results:
-                    break
-
-                entry_path = os.path.join(full_path, entry)
-                relative_path = os.path.relpath(entry_path, repo_path)
-
-                stat_info = os.stat(entry_path)
-                items.append({
-                    "name": entry,
-                    "path": relative_path.replace('\\', '/'),  # 统一使用 /
-                    "type": "directory" if os.path.isdir(entry_path) else "file",
-                    "size": stat_info.st_size if os.path.isfile(entry_path) else 0
-                })
+            # scandir 的目录项自带文件类型，省去每项的 isdir/isfile 系统调用
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    if max_results > 0 and len(items) >= max_results:
+                        break
+
+                    relative_path = os.path.normpath(os.path.join(relative_dir, entry.name))
+                    is_dir = entry.is_dir()
+                    items.append({
+                        "name": entry.name,
+                        "path": relative_path.replace('\\', '/'),  # 统一使用 /
+                        "type": "directory" if is_dir else "file",
+                        "size": entry.stat().st_size if not is_dir and entry.is_file() else 0
+                    })
         except PermissionError:
             logger.warning(f"无权限访问目录: {full_path}")
 
@@ -342,6 +358,9 @@ class FileListToolHandler(BaseToolHandler):
                     '.nuxt', 'coverage', '.vscode', '.idea'
                 }]
 
+                # 当前目录的相对路径每个目录只计算一次
+                relative_root = os.path.relpath(root, repo_path)
+
                 # 添加文件
                 for entry in files:
                     if max_results > 0 and len(items) >= max_results:
@@ -350,11 +369,10 @@ class FileListToolHandler(BaseToolHandler):
                     if entry.startswith('.'):
                         continue
 
-                    entry_path = os.path.join(root, entry)
-                    relative_path = os.path.relpath(entry_path, repo_path)
+                    relative_path = os.path.normpath(os.path.join(relative_root, entry))
 
                     try:
-                        stat_info = os.stat(entry_path)
+                        stat_info = os.stat(os.path.join(root, entry))
                         items.append({
                             "name": entry,
                             "path": relative_path.replace('\\', '/'),
@@ -369,8 +387,7 @@ class FileListToolHandler(BaseToolHandler):
                     if max_results > 0 and len(items) >= max_results:
                         return items  # 提前返回
 
-                    dir_path = os.path.join(root, d)
-                    relative_path = os.path.relpath(dir_path, repo_path)
+                    relative_path = os.path.normpath(os.path.join(relative_root, d))
                     items.append({
                         "name": d,
                         "path": relative_path.replace('\\', '/'),
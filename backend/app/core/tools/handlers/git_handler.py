@@ -3,17 +3,32 @@ Git 相关工具处理器
 """
 
 from typing import Dict, Any
+import asyncio
+import functools
 import logging
 
 from ..base import ToolSpec, ToolParameter, ToolContext, ToolResult
 from ..handler import BaseToolHandler
+from .search_handler import invalidate_file_list
 
 logger = logging.getLogger(__name__)
 
 
+async def _run_git(func, *args, **kwargs) -> Any:
+    """在线程池中执行阻塞的 Git 操作
+
+    GitPython 通过子进程调用 git 并同步等待输出，直接在协程中调用会阻塞事件循环，
+    也让并发执行的只读工具退化为串行
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
 class GitDiffToolHandler(BaseToolHandler):
     """Git Diff 工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "git_diff"
@@ -51,17 +66,19 @@ class GitDiffToolHandler(BaseToolHandler):
         repo_path = context.repository_path
 
         try:
-            git_project = GitProject(repo_path)
+            git_project = await _run_git(GitProject, repo_path)
 
             if file_path:
                 # 获取单个文件的 diff
-                diff_output = git_project.get_diff(
+                diff_output = await _run_git(
+                    git_project.get_diff,
                     file_path=file_path,
                     staged=staged
                 )
             else:
                 # 获取所有变更的 diff
-                diff_output = git_project.get_diff(
+                diff_output = await _run_git(
+                    git_project.get_diff,
                     file_path=None,
                     staged=staged
                 )
@@ -81,6 +98,8 @@ class GitDiffToolHandler(BaseToolHandler):
 class GitLogToolHandler(BaseToolHandler):
     """Git Log 工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "git_log"
@@ -117,17 +136,18 @@ class GitLogToolHandler(BaseToolHandler):
         repo_path = context.repository_path
 
         try:
-            git_project = GitProject(repo_path)
+            git_project = await _run_git(GitProject, repo_path)
 
             if file_path:
                 # 获取单个文件的日志
-                commits = git_project.get_file_log(
+                commits = await _run_git(
+                    git_project.get_file_log,
                     file_path=file_path,
                     limit=limit
                 )
             else:
                 # 获取所有提交历史
-                commits = git_project.get_recent_commits(limit=limit)
+                commits = await _run_git(git_project.get_recent_commits, limit=limit)
 
             return {
                 "file_path": file_path or "(所有文件)",
@@ -144,6 +164,8 @@ class GitLogToolHandler(BaseToolHandler):
 class GitStatusToolHandler(BaseToolHandler):
     """Git Status 工具处理器"""
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "git_status"
@@ -163,8 +185,8 @@ class GitStatusToolHandler(BaseToolHandler):
         repo_path = context.repository_path
 
         try:
-            git_project = GitProject(repo_path)
-            status = git_project.get_status()
+            git_project = await _run_git(GitProject, repo_path)
+            status = await _run_git(git_project.get_status)
 
             return {
                 "repo_path": repo_path,
@@ -215,17 +237,17 @@ class GitBranchToolHandler(BaseToolHandler):
         repo_path = context.repository_path
 
         try:
-            git_project = GitProject(repo_path)
+            git_project = await _run_git(GitProject, repo_path)
 
             if action == "list":
-                branches = git_project.list_branches()
+                branches = await _run_git(git_project.list_branches)
                 return {
                     "action": action,
                     "branches": branches
                 }
 
             elif action == "current":
-                current = git_project.get_current_branch()
+                current = await _run_git(git_project.get_current_branch)
                 return {
                     "action": action,
                     "current_branch": current
@@ -234,7 +256,7 @@ class GitBranchToolHandler(BaseToolHandler):
             elif action == "create":
                 if not branch_name:
                     raise ValueError("创建分支需要提供 branch_name")
-                git_project.create_branch(branch_name)
+                await _run_git(git_project.create_branch, branch_name)
                 return {
                     "action": action,
                     "branch_name": branch_name,
@@ -244,7 +266,9 @@ class GitBranchToolHandler(BaseToolHandler):
             elif action == "switch":
                 if not branch_name:
                     raise ValueError("切换分支需要提供 branch_name")
-                git_project.switch_branch(branch_name)
+                await _run_git(git_project.switch_branch, branch_name)
+                # 切换分支会改变工作区文件，清除搜索工具的文件列表缓存
+                invalidate_file_list(repo_path)
                 return {
                     "action": action,
                     "branch_name": branch_name,
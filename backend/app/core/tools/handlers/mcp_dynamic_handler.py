@@ -10,6 +10,7 @@ from typing import Dict, Any
 from ..handler import BaseToolHandler
 from ..base import ToolSpec, ToolResult, ToolContext
 from ..mcp_dynamic import parse_dynamic_tool_name
+from .mcp_handler import format_mcp_content
 from app.core.mcp_server import MCPServerManager
 
 
@@ -85,10 +86,9 @@ class DynamicMcpToolHandler(BaseToolHandler):
                 )
 
             # 4. 确保服务器已启动
-            client = mcp_manager._active_clients.get(self._server_name)
-            if not client:
+            if self._server_name not in mcp_manager._active_clients:
                 logger.info(f"启动 MCP 服务器: {self._server_name}")
-                success = await mcp_manager.start_server(self._server_name)
+                success = await mcp_manager.ensure_server_started(self._server_name)
                 if not success:
                     return ToolResult(
                         success=False,
@@ -121,24 +121,9 @@ class DynamicMcpToolHandler(BaseToolHandler):
 
                 if isinstance(content_list, list):
                     # 格式化内容项
-                    formatted_parts = []
-                    for item in content_list:
-                        if isinstance(item, dict):
-                            if item.get("type") == "text":
-                                formatted_parts.append(item.get("text", ""))
-                            elif item.get("type") == "image":
-                                formatted_parts.append(f"[图像: {item.get('data', '')[:50]}...]")
-                            elif item.get("type") == "resource":
-                                formatted_parts.append(f"[资源: {json.dumps(item.get('resource', {}), ensure_ascii=False)}]")
-                            else:
-                                # 其他类型直接转 JSON
-                                formatted_parts.append(json.dumps(item, ensure_ascii=False))
-                        else:
-                            formatted_parts.append(str(item))
-
                     return ToolResult(
                         success=True,
-                        data="\n\n".join(formatted_parts),
+                        data=format_mcp_content(content_list),
                         metadata={
                             "server_name": self._server_name,
                             "tool_name": self._mcp_tool_name,
@@ -160,7 +145,7 @@ class DynamicMcpToolHandler(BaseToolHandler):
                 # 其他格式直接返回
                 return ToolResult(
                     success=True,
-                    data=json.dumps(tool_result, ensure_ascii=False, indent=2),
+                    data=json.dumps(tool_result, ensure_ascii=False),
                     metadata={
                         "server_name": self._server_name,
                         "tool_name": self._mcp_tool_name,
@@ -8,8 +8,11 @@ MCP 工具处理器 - 参考Cline的UseMcpToolHandler和AccessMcpResourceHandler
 """
 
 import json
+import time
+import asyncio
+import threading
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, List, Callable
 from pydantic import BaseModel
 
 from ..handler import BaseToolHandler
@@ -22,13 +25,52 @@ logger = logging.getLogger(__name__)
 
 # 全局 MCP 服务器管理器
 _mcp_server_manager: Optional[MCPServerManager] = None
+_mcp_server_manager_lock = threading.Lock()
+
+# 服务器描述缓存（工具和资源列表）：server_name -> (时间戳, 描述)
+_server_descriptions: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_server_description_ttl = 30  # 30秒
+
+
+def _invalidate_server_description(server_name: str) -> None:
+    """服务器启动/停止/配置变更时清除其描述缓存"""
+    _server_descriptions.pop(server_name, None)
+
+
+# MCP 内容项格式化器（按 type 查表分发）
+_CONTENT_FORMATTERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "text": lambda item: item.get("text", ""),
+    "image": lambda item: f"[图像: {item.get('data', '')[:50]}...]",
+    "resource": lambda item: f"[资源: {json.dumps(item.get('resource', {}), ensure_ascii=False)}]",
+}
+
+
+def _format_content_item(item: Any) -> str:
+    """格式化单个 MCP 内容项"""
+    if not isinstance(item, dict):
+        return str(item)
+    formatter = _CONTENT_FORMATTERS.get(item.get("type"))
+    if formatter is None:
+        # 其他类型直接转 JSON
+        return json.dumps(item, ensure_ascii=False)
+    return formatter(item)
+
+
+def format_mcp_content(content_list: List[Any]) -> str:
+    """将 MCP 工具返回的内容列表格式化为文本"""
+    return "\n\n".join([_format_content_item(item) for item in content_list])
 
 
 def get_mcp_server_manager() -> MCPServerManager:
-    """获取全局 MCP 服务器管理器"""
+    """获取全局 MCP 服务器管理器（线程安全的懒加载，保证只创建一个实例）"""
     global _mcp_server_manager
     if _mcp_server_manager is None:
-        _mcp_server_manager = MCPServerManager()
+        with _mcp_server_manager_lock:
+            # 双重检查：等待锁期间其他线程可能已完成创建
+            if _mcp_server_manager is None:
+                manager = MCPServerManager()
+                manager.add_state_listener(_invalidate_server_description)
+                _mcp_server_manager = manager
     return _mcp_server_manager
 
 
@@ -135,11 +177,10 @@ class UseMcpToolHandler(BaseToolHandler):
                 )
 
             # 7. 确保服务器已启动
-            client = mcp_manager._active_clients.get(server_name)
-            if not client:
+            if server_name not in mcp_manager._active_clients:
                 # 尝试启动服务器
                 logger.info(f"启动 MCP 服务器: {server_name}")
-                success = await mcp_manager.start_server(server_name)
+                success = await mcp_manager.ensure_server_started(server_name)
                 if not success:
                     return ToolResult(
                         success=False,
@@ -172,24 +213,9 @@ class UseMcpToolHandler(BaseToolHandler):
 
                 if isinstance(content_list, list):
                     # 格式化内容项
-                    formatted_parts = []
-                    for item in content_list:
-                        if isinstance(item, dict):
-                            if item.get("type") == "text":
-                                formatted_parts.append(item.get("text", ""))
-                            elif item.get("type") == "image":
-                                formatted_parts.append(f"[图像: {item.get('data', '')[:50]}...]")
-                            elif item.get("type") == "resource":
-                                formatted_parts.append(f"[资源: {json.dumps(item.get('resource', {}), ensure_ascii=False)}]")
-                            else:
-                                # 其他类型直接转 JSON
-                                formatted_parts.append(json.dumps(item, ensure_ascii=False))
-                        else:
-                            formatted_parts.append(str(item))
-
                     return ToolResult(
                         success=True,
-                        data="\n\n".join(formatted_parts),
+                        data=format_mcp_content(content_list),
                         metadata={
                             "server_name": server_name,
                             "tool_name": tool_name
@@ -209,7 +235,7 @@ class UseMcpToolHandler(BaseToolHandler):
                 # 其他格式直接返回
                 return ToolResult(
                     success=True,
-                    data=json.dumps(tool_result, ensure_ascii=False, indent=2),
+                    data=json.dumps(tool_result, ensure_ascii=False),
                     metadata={
                         "server_name": server_name,
                         "tool_name": tool_name
@@ -291,9 +317,8 @@ class AccessMcpResourceHandler(BaseToolHandler):
                 )
 
             # 5. 确保服务器已启动
-            client = mcp_manager._active_clients.get(server_name)
-            if not client:
-                success = await mcp_manager.start_server(server_name)
+            if server_name not in mcp_manager._active_clients:
+                success = await mcp_manager.ensure_server_started(server_name)
                 if not success:
                     return ToolResult(
                         success=False,
@@ -323,7 +348,7 @@ class AccessMcpResourceHandler(BaseToolHandler):
                 if content.get("type") == "text":
                     data = content.get("text", "")
                 else:
-                    data = json.dumps(content, ensure_ascii=False, indent=2)
+                    data = json.dumps(content, ensure_ascii=False)
             else:
                 # 其他格式
                 data = str(content)
@@ -352,6 +377,8 @@ class ListMcpServersHandler(BaseToolHandler):
     列出所有可用的 MCP 服务器及其工具和资源
     """
 
+    read_only = True
+
     @property
     def name(self) -> str:
         return "list_mcp_servers"
@@ -382,56 +409,28 @@ class ListMcpServersHandler(BaseToolHandler):
                 enabled = config.get("enabled", True)
                 logger.info(f"🔧 list_mcp_servers 配置: {server_name} -> enabled={enabled}, config={config}")
 
-            # 构建服务器列表
-            servers_info = []
-
-            for server_name, config in servers_config.items():
-                # 获取服务器状态
-                status_info = await mcp_manager.get_server_status(server_name)
-
-                # 🔥 调试日志：显示运行时状态
-                logger.info(f"🔧 list_mcp_servers 运行时: {server_name} -> status={status_info.get('status', 'unknown')}, connected={status_info.get('connected', False)}")
-
-                server_info = {
-                    "name": server_name,
-                    "description": config.get("description", ""),
-                    "status": status_info.get("status", "unknown"),
-                    "enabled": config.get("enabled", True),
-                    "transport_type": config.get("transportType", "stdio")
-                }
-
-                # 如果服务器正在运行，获取工具和资源列表
-                if status_info.get("connected"):
-                    try:
-                        # 获取工具列表
-                        tools = await mcp_manager.list_tools(server_name)
-                        server_info["tools"] = [
-                            {
-                                "name": tool["name"],
-                                "description": tool.get("description", "")
-                            }
-                            for tool in tools
-                        ]
-
-                        # 获取资源列表
-                        resources = await mcp_manager.list_resources(server_name)
-                        server_info["resources"] = [
-                            {
-                                "uri": resource["uri"],
-                                "name": resource.get("name", ""),
-                                "description": resource.get("description", "")
-                            }
-                            for resource in resources
-                        ]
-
-                    except Exception as e:
-                        logger.warning(f"获取 {server_name} 的工具/资源列表失败: {e}")
+            # 构建服务器列表（各服务器相互独立，并发获取；单个服务器出错不影响其他服务器）
+            results = await asyncio.gather(*[
+                self._describe_server(mcp_manager, server_name, config)
+                for server_name, config in servers_config.items()
+            ], return_exceptions=True)
 
+            servers_info = []
+            for (server_name, config), server_info in zip(servers_config.items(), results):
+                if isinstance(server_info, BaseException):
+                    logger.warning(f"获取 {server_name} 的状态失败: {server_info}")
+                    server_info = {
+                        "name": server_name,
+                        "description": config.get("description", ""),
+                        "status": "unknown",
+                        "enabled": config.get("enabled", True),
+                        "transport_type": config.get("transportType", "stdio")
+                    }
                 servers_info.append(server_info)
 
             return ToolResult(
                 success=True,
-                data=json.dumps(servers_info, ensure_ascii=False, indent=2),
+                data=json.dumps(servers_info, ensure_ascii=False),
                 metadata={
                     "total_servers": len(servers_info),
                     "active_servers": sum(1 for s in servers_info if s["status"] == "running")
@@ -444,3 +443,77 @@ class ListMcpServersHandler(BaseToolHandler):
                 success=False,
                 error=f"列表获取异常: {str(e)}"
             )
+
+    async def _describe_server(
+        self,
+        mcp_manager: MCPServerManager,
+        server_name: str,
+        config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """获取单个服务器的状态、工具和资源描述"""
+        # 获取服务器状态
+        status_info = await mcp_manager.get_server_status(server_name)
+
+        # 🔥 调试日志：显示运行时状态
+        logger.info(f"🔧 list_mcp_servers 运行时: {server_name} -> status={status_info.get('status', 'unknown')}, connected={status_info.get('connected', False)}")
+
+        server_info = {
+            "name": server_name,
+            "description": config.get("description", ""),
+            "status": status_info.get("status", "unknown"),
+            "enabled": config.get("enabled", True),
+            "transport_type": config.get("transportType", "stdio")
+        }
+
+        # 只有运行中的服务器才有工具和资源列表
+        if not status_info.get("connected"):
+            return server_info
+
+        # 优先使用缓存
+        cached = _server_descriptions.get(server_name)
+        if cached and time.time() - cached[0] < _server_description_ttl:
+            server_info.update(cached[1])
+            return server_info
+
+        # 并发获取工具列表和资源列表
+        tools, resources = await asyncio.gather(
+            mcp_manager.list_tools(server_name),
+            mcp_manager.list_resources(server_name),
+            return_exceptions=True
+        )
+
+        # 工具列表和资源列表分别处理：一个获取失败时仍返回另一个
+        description = {}
+
+        try:
+            if isinstance(tools, BaseException):
+                raise tools
+            description["tools"] = [
+                {
+                    "name": tool["name"],
+                    "description": tool.get("description", "")
+                }
+                for tool in tools
+            ]
+        except Exception as e:
+            logger.warning(f"获取 {server_name} 的工具列表失败: {e}")
+
+        try:
+            if isinstance(resources, BaseException):
+                raise resources
+            description["resources"] = [
+                {
+                    "uri": resource["uri"],
+                    "name": resource.get("name", ""),
+                    "description": resource.get("description", "")
+                }
+                for resource in resources
+            ]
+        except Exception as e:
+            logger.warning(f"获取 {server_name} 的资源列表失败: {e}")
+
+        # 只缓存完整的描述，部分失败时下次重新获取
+        if len(description) == 2:
+            _server_descriptions[server_name] = (time.time(), description)
+        server_info.update(description)
+        return server_info
@@ -6,12 +6,25 @@
 
 import os
 import re
+import json
+import shutil
+import hashlib
+import fnmatch
+import functools
+import itertools
 import time
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
 from ..base import ToolSpec, ToolParameter, ToolContext
 from ..handler import BaseToolHandler
 
@@ -19,44 +32,363 @@ from ..handler import BaseToolHandler
 logger = logging.getLogger(__name__)
 
 
-# 简单的内存缓存
-_search_cache = {}
-_cache_max_size = 100
-_cache_ttl = 300  # 5分钟
+# ripgrep 可执行文件路径（模块加载时检测一次）
+_RG_PATH = shutil.which('rg')
+
+# 常见忽略的目录和文件
+_IGNORE_DIRS = frozenset({
+    '.git', '.idea', '.vscode', 'node_modules', '__pycache__',
+    'venv', 'env', '.venv', 'dist', 'build', 'target', 'bin',
+    'obj', '.next', '.nuxt', 'coverage'
+})
+
+_IGNORE_EXTENSIONS = frozenset({
+    '.pyc', '.pyo', '.exe', '.dll', '.so', '.dylib',
+    '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg',
+    '.zip', '.tar', '.gz', '.rar', '.7z',
+    '.mp3', '.mp4', '.avi', '.mov', '.pdf'
+})
+
+# 单个文件大小上限（超过则跳过）
+_MAX_FILE_SIZE = 1_000_000
+
+# 单次搜索最多涉及的文件数
+_MAX_SEARCH_FILES = 100
+
+# 读取 ripgrep --json 输出时的单行上限：一条匹配事件同时包含整行文本和各子匹配文本，
+# 最坏情况下每个字节都被 JSON 转义为 6 个字符（\u00XX）
+_RG_LINE_LIMIT = 2 * 6 * _MAX_FILE_SIZE + 64 * 1024
+
+# ripgrep 的忽略规则参数，与 Python 遍历使用相同的忽略目录和扩展名；
+# --no-ignore/--hidden 关闭 ripgrep 默认的 .gitignore/.ignore 规则和隐藏文件过滤，
+# Python 遍历不读取这些规则，两条路径才能搜索同一批文件
+_RG_IGNORE_ARGS = ('--no-ignore', '--hidden') + tuple(
+    [arg for d in sorted(_IGNORE_DIRS) for arg in ('--glob', f'!{d}/')]
+    + [arg for ext in sorted(_IGNORE_EXTENSIONS) for arg in ('--iglob', f'!*{ext}')]
+)
 
+# 二进制检测时检查的文件头部字节数
+_BINARY_SNIFF_SIZE = 8192
 
-def _get_cache_key(pattern: str, path: str, file_pattern: str, case_sensitive: bool) -> str:
-    """生成缓存键"""
-    return f"{pattern}:{path}:{file_pattern}:{case_sensitive}"
+# 读取文件使用的 os.open 标志（Windows 下需要 O_BINARY 避免换行转换）
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+# 简单的内存缓存（按最近使用顺序排列，最久未使用的在前）
+_search_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_cache_max_size = 100
+_cache_ttl = 300  # 5分钟
 
 
-def _get_from_cache(cache_key: str) -> Optional[Dict[str, Any]]:
+def _get_cache_key(
+    repo_path: str,
+    pattern: str,
+    path: str,
+    file_pattern: str,
+    case_sensitive: bool,
+    max_results: int
+) -> bytes:
+    """生成缓存键
+
+    使用 128 位 BLAKE2b 摘要作为键：键长度固定，不随正则长度增长；
+    各字段以 NUL 分隔，避免字段内容含分隔符时发生键冲突。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repo_path.encode('utf-8', 'surrogateescape'))
+    h.update(b'\0')
+    h.update(pattern.encode('utf-8', 'surrogatepass'))
+    h.update(b'\0')
+    h.update(path.encode('utf-8', 'surrogateescape'))
+    h.update(b'\0')
+    h.update((file_pattern or '').encode('utf-8', 'surrogatepass'))
+    h.update(b'\0')
+    h.update(str(max_results).encode('utf-8'))
+    h.update(b'\1' if case_sensitive else b'\0')
+    return h.digest()
+
+
+def _get_from_cache(cache_key: bytes) -> Optional[Dict[str, Any]]:
     """从缓存获取结果"""
     if cache_key in _search_cache:
         result, timestamp = _search_cache[cache_key]
         if time.time() - timestamp < _cache_ttl:
+            _search_cache.move_to_end(cache_key)
             return result
         else:
             del _search_cache[cache_key]
     return None
 
 
-def _set_cache(cache_key: str, result: Dict[str, Any]) -> None:
+def _set_cache(cache_key: bytes, result: Dict[str, Any]) -> None:
     """设置缓存"""
-    if len(_search_cache) >= _cache_max_size:
-        # LRU淘汰：删除最旧的缓存
-        oldest_key = min(_search_cache.keys(), key=lambda k: _search_cache[k][1])
-        del _search_cache[oldest_key]
+    if cache_key not in _search_cache and len(_search_cache) >= _cache_max_size:
+        # LRU淘汰：删除最久未使用的缓存
+        _search_cache.popitem(last=False)
     _search_cache[cache_key] = (result, time.time())
+    _search_cache.move_to_end(cache_key)
+
+
+# 待搜索文件列表缓存：(仓库路径, 搜索路径, 文件通配符) -> (文件列表, 时间戳, 仓库状态指纹)
+# 同一目录下用不同模式反复搜索时只遍历一次目录树；文件系统会变化，TTL 比结果缓存短
+_filelist_cache: "OrderedDict[Tuple[str, str, str], Tuple[List[str], float, Tuple[int, int]]]" = OrderedDict()
+_filelist_cache_max_size = 32
+_filelist_cache_ttl = 30
+
+
+def _repo_fingerprint(repo_path: str) -> Tuple[int, int]:
+    """仓库状态指纹：.git/HEAD 与 .git/index 的修改时间
+
+    切换分支、checkout、pull 等 Git 操作都会改写这两个文件，
+    无论操作是否经由工具执行，指纹变化都会让缓存的文件列表失效
+    """
+    git_dir = os.path.join(repo_path, '.git')
+    fingerprint = []
+    for name in ('HEAD', 'index'):
+        try:
+            fingerprint.append(os.stat(os.path.join(git_dir, name)).st_mtime_ns)
+        except OSError:
+            fingerprint.append(0)
+    return tuple(fingerprint)
+
+
+def _get_cached_filelist(key: Tuple[str, str, str], fingerprint: Tuple[int, int]) -> Optional[List[str]]:
+    """从缓存获取待搜索文件列表"""
+    if key in _filelist_cache:
+        files, timestamp, cached_fingerprint = _filelist_cache[key]
+        if time.time() - timestamp < _filelist_cache_ttl and cached_fingerprint == fingerprint:
+            _filelist_cache.move_to_end(key)
+            return files
+        else:
+            del _filelist_cache[key]
+    return None
+
+
+def _set_cached_filelist(key: Tuple[str, str, str], files: List[str], fingerprint: Tuple[int, int]) -> None:
+    """缓存待搜索文件列表"""
+    if key not in _filelist_cache and len(_filelist_cache) >= _filelist_cache_max_size:
+        _filelist_cache.popitem(last=False)
+    _filelist_cache[key] = (files, time.time(), fingerprint)
+    _filelist_cache.move_to_end(key)
+
+
+def invalidate_file_list(repo_path: str) -> None:
+    """清除指定仓库的文件列表缓存（工具新建文件或切换分支后调用）"""
+    for key in [key for key in _filelist_cache if key[0] == repo_path]:
+        del _filelist_cache[key]
+
+
+# 字面量预过滤的最小长度（过短的字面量几乎总能命中，预过滤没有意义）
+_PREFILTER_MIN_LENGTH = 3
+
+# Python 搜索路径中每个工作者一次处理的文件数
+_SEARCH_BATCH_SIZE = 16
+
+# 线程池工作线程数
+_THREAD_POOL_WORKERS = 4
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_pattern(pattern: str, case_sensitive: bool) -> "re.Pattern[str]":
+    """编译搜索正则（带缓存，Agent 循环中常重复搜索同一模式）
+
+    使用 str 模式编译并在解码后的文本上逐行匹配：\\w、. 和字符类按字符（而非字节）匹配，
+    与 ripgrep 的 Unicode 语义一致。
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+def _longest_literal(items) -> str:
+    """返回解析后的正则片段中每次匹配都必须出现的最长连续字面量
+
+    零宽断言（^、$、\\b 等）不打断连续字面量；纯字面量分组并入当前序列；
+    其余分组和至少重复一次的片段递归取其内部字面量作为候选；
+    分支、可选重复等无法确定的结构直接打断序列。
+    """
+    best = ""
+    run = []
+
+    for op, arg in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        if op is sre_constants.AT:
+            continue
+
+        candidate = ""
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = arg
+            if not (add_flags or del_flags):
+                if all(sub_op is sre_constants.LITERAL for sub_op, _ in sub):
+                    run.extend(chr(sub_arg) for _, sub_arg in sub)
+                    continue
+                candidate = _longest_literal(sub)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            min_count, _, sub = arg
+            if min_count >= 1:
+                candidate = _longest_literal(sub)
+
+        if len(run) > len(best):
+            best = "".join(run)
+        run.clear()
+        if len(candidate) > len(best):
+            best = candidate
+
+    if len(run) > len(best):
+        best = "".join(run)
+    return best
+
+
+@functools.lru_cache(maxsize=128)
+def _required_literal(regex: "re.Pattern[str]") -> Optional[str]:
+    """提取正则每次匹配都必须包含的最长字面量，用于快速排除不相关的文件和行
+
+    忽略大小写时返回小写形式；无法确定时返回 None（不做预过滤）。
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        best = _longest_literal(parsed)
+    except Exception:
+        return None
+
+    if len(best) < _PREFILTER_MIN_LENGTH:
+        return None
+    if regex.flags & re.IGNORECASE:
+        # 非 ASCII 字面量忽略大小写时可能匹配 ASCII 文本（如 ſ 匹配 s），无法用 lower() 预过滤
+        if not best.isascii():
+            return None
+        best = best.lower()
+    return best
+
+
+def _take(iterator: Iterator[str], n: int) -> List[str]:
+    """从迭代器中取出至多 n 个元素"""
+    return list(itertools.islice(iterator, n))
+
+
+def _contains_literal(text: str, literal: str, ignore_case: bool) -> bool:
+    """判断文本是否可能包含正则的必需字面量（预过滤用，不能误判为不包含）
+
+    忽略大小写时只对纯 ASCII 文本做 lower() 比较：Unicode 的大小写折叠
+    （如 ſ 与 s、K 与 k）和 lower() 并不一致，非 ASCII 文本一律视为可能包含。
+    """
+    if not ignore_case:
+        return literal in text
+    if not text.isascii():
+        return True
+    return literal in text.lower()
+
+
+def _search_in_file(
+    file_path: str,
+    regex: "re.Pattern[str]",
+    repo_path: str,
+    max_matches: int,
+    prefilter: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """在单个文件中搜索 - 优化版本
+
+    regex 为 execute 中预编译的正则，此处不要重新编译。
+    与 ripgrep 一样逐行匹配：匹配不会跨行，^/$ 对应每一行的首尾。
+    """
+    matches = []
+
+    try:
+        # 以字节方式一次性读取，先做二进制检测，再解码
+        fd = os.open(file_path, _OPEN_FLAGS)
+        try:
+            # 文件大小检查：跳过过大的文件（>1MB）
+            file_size = os.fstat(fd).st_size
+            if file_size > _MAX_FILE_SIZE:
+                logger.debug("跳过过大文件: %s (%d bytes)", file_path, file_size)
+                return matches
+
+            data = os.read(fd, file_size)
+        finally:
+            os.close(fd)
+
+        # 二进制检测：文件头部含 NUL 字节视为二进制文件（与 grep/rg 相同的启发式）
+        if data.find(b'\x00', 0, _BINARY_SNIFF_SIZE) != -1:
+            return matches
+
+        # 优先 UTF-8，失败后按 latin-1 解码（latin-1 不会失败）
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            content = data.decode('latin-1')
+
+        ignore_case = bool(regex.flags & re.IGNORECASE)
+
+        # 字面量预过滤：不含必需字面量的文件直接跳过
+        if prefilter is not None and not _contains_literal(content, prefilter, ignore_case):
+            return matches
+
+        # 与文本模式读取一致：统一换行符后按行切分
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+        # 搜索匹配
+        relative_path = os.path.relpath(file_path, repo_path).replace('\\', '/')
+
+        # 逐行搜索，提前退出
+        for line_num, line in enumerate(content.split('\n'), 1):
+            if len(matches) >= max_matches:
+                break
+
+            # 快速预检查：不含必需字面量的行不可能匹配
+            if prefilter is not None and not _contains_literal(line, prefilter, ignore_case):
+                continue
+
+            # 精确匹配位置
+            for match in regex.finditer(line):
+                matches.append({
+                    "file": relative_path,
+                    "line": line_num,
+                    "column": match.start() + 1,
+                    "match": match.group(),
+                    "context": line.strip()
+                })
+
+                if len(matches) >= max_matches:
+                    break
+
+    except Exception as e:
+        logger.warning(f"读取文件失败: {file_path}, 错误: {e}")
+
+    return matches
+
+
+def _search_file_batch(
+    file_paths: List[str],
+    regex: "re.Pattern[str]",
+    repo_path: str,
+    max_matches: int,
+    max_results: int,
+    prefilter: Optional[str] = None
+) -> List[List[Dict[str, Any]]]:
+    """在线程池工作者中依次搜索一批文件
+
+    批量提交以减少任务调度次数；本批结果已凑够 max_results 时跳过剩余文件。
+    """
+    batch_results = []
+    total = 0
+    for file_path in file_paths:
+        if total >= max_results:
+            break
+        matches = _search_in_file(file_path, regex, repo_path, max_matches, prefilter)
+        total += len(matches)
+        batch_results.append(matches)
+    return batch_results
 
 
 class SearchFilesToolHandler(BaseToolHandler):
     """文件内容搜索工具处理器 - 支持并发搜索"""
 
+    read_only = True
+
     def __init__(self):
         super().__init__()
-        # 线程池用于并发搜索（4个并发工作线程）
-        self._executor = ThreadPoolExecutor(max_workers=4)
+        # 线程池用于目录遍历和并发搜索
+        self._executor = ThreadPoolExecutor(max_workers=_THREAD_POOL_WORKERS)
 
     @property
     def name(self) -> str:
@@ -116,6 +448,7 @@ class SearchFilesToolHandler(BaseToolHandler):
 
         # 构建搜索路径 - 标准化路径输入
         if not search_path or search_path in ["/", ".", "./"]:
+            normalized_path = ""
             full_search_path = repo_path
         else:
             normalized_path = search_path.lstrip("/").lstrip("./")
@@ -123,92 +456,76 @@ class SearchFilesToolHandler(BaseToolHandler):
 
         # 安全检查
         try:
-            abs_search = os.path.abspath(full_search_path)
-            abs_repo = os.path.abspath(repo_path)
-            if not abs_search.startswith(abs_repo):
+            if context.resolve_repo_path(normalized_path) is None:
                 raise ValueError(f"非法搜索路径: {search_path}")
         except Exception as e:
             raise ValueError(f"路径验证失败: {e}")
 
-        # 编译正则表达式
+        # 编译正则表达式（只在这里编译一次，编译结果在所有工作线程间共享）
         try:
-            flags = 0 if case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
+            regex = _compile_pattern(pattern, case_sensitive)
         except re.error as e:
             raise ValueError(f"无效的正则表达式: {e}")
 
+        # 文件名通配符只转换编译一次（与 fnmatch.fnmatch 一致，按平台决定是否忽略大小写）
+        name_re = None
+        if file_pattern:
+            name_flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+            name_re = re.compile(fnmatch.translate(file_pattern), name_flags)
+
         # 检查缓存
-        cache_key = _get_cache_key(pattern, search_path, file_pattern, case_sensitive)
+        cache_key = _get_cache_key(
+            repo_path, pattern, search_path, file_pattern, case_sensitive, max_results
+        )
         cached_result = _get_from_cache(cache_key)
         if cached_result:
-            logger.info(f"使用缓存搜索结果: {pattern}")
+            logger.info("使用缓存搜索结果: %s", pattern)
             return cached_result
 
         # 开始计时
         start_time = time.time()
 
-        # 确定要搜索的文件
-        files_to_search = self._get_files_to_search(full_search_path, file_pattern)
-
-        # 限制搜索文件数量
-        max_files = 100
-        files_to_search = files_to_search[:max_files]
-
-        # 并发搜索文件
-        results = []
-        total_matches = 0
-        files_scanned = 0
-
-        # 使用线程池并发搜索
-        loop = asyncio.get_event_loop()
-
-        # 创建搜索任务
-        tasks = [
-            loop.run_in_executor(
-                self._executor,
-                self._search_in_file,
-                file_path,
-                regex,
-                repo_path,
-                min(10, max_results)  # 每个文件最多10个结果
+        # 优先使用 ripgrep，不可用或执行失败时回退到 Python 实现
+        rg_output = None
+        if _RG_PATH:
+            rg_output = await self._search_with_ripgrep(
+                pattern, full_search_path, file_pattern, case_sensitive, repo_path, max_results
             )
-            for file_path in files_to_search
-        ]
-
-        # 等待所有任务完成（使用 gather 以支持并发）
-        completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 收集结果
-        for matches in completed_tasks:
-            if total_matches >= max_results:
-                break
 
-            if isinstance(matches, Exception):
-                # 忽略单个文件的错误
-                continue
-
-            if matches:
-                results.extend(matches)
-                total_matches += len(matches)
-                files_scanned += 1
+        if rg_output is not None:
+            results, files_scanned, files_total = rg_output
+            total_matches = len(results)
+            concurrency = 1  # --sort 使 ripgrep 单线程搜索
+            engine = "ripgrep"
+        else:
+            results, files_scanned, files_total, concurrency = await self._search_with_python(
+                regex, full_search_path, file_pattern, name_re, repo_path, max_results
+            )
+            total_matches = len(results)
+            engine = "python"
 
         # 计算搜索时间
         search_time = (time.time() - start_time) * 1000  # 转换为毫秒
 
         # 构建结果
+        performance = {
+            "files_scanned": files_scanned,
+            "search_time_ms": round(search_time, 2),
+            "engine": engine,
+            "concurrent": True,
+            "concurrency": concurrency
+        }
+        # ripgrep 提前终止时没有统计摘要，搜索文件总数未知，不输出该字段
+        if files_total is not None:
+            performance["files_total"] = files_total
+
         result = {
             "pattern": pattern,
             "path": search_path or "/",
             "file_pattern": file_pattern or "*",
             "total_matches": total_matches,
             "results": results[:max_results],
-            "performance": {
-                "files_scanned": files_scanned,
-                "files_total": len(files_to_search),
-                "search_time_ms": round(search_time, 2),
-                "concurrent": True,
-                "concurrency": 4
-            }
+            "performance": performance
         }
 
         # 缓存结果
@@ -216,113 +533,281 @@ class SearchFilesToolHandler(BaseToolHandler):
 
         return result
 
-    def _get_files_to_search(self, search_path: str, file_pattern: str) -> List[str]:
-        """获取要搜索的文件列表"""
-        files = []
+    async def _search_with_python(
+        self,
+        regex: "re.Pattern[str]",
+        search_path: str,
+        file_pattern: Optional[str],
+        name_re: Optional["re.Pattern[str]"],
+        repo_path: str,
+        max_results: int
+    ) -> tuple:
+        """使用线程池并发搜索
 
-        # 常见忽略的目录和文件
-        ignore_dirs = {
-            '.git', '.idea', '.vscode', 'node_modules', '__pycache__',
-            'venv', 'env', '.venv', 'dist', 'build', 'target', 'bin',
-            'obj', '.next', '.nuxt', 'coverage'
-        }
+        Returns:
+            (匹配列表, 命中文件数, 搜索文件总数, 并发数)
+        """
+        loop = asyncio.get_event_loop()
 
-        ignore_extensions = {
-            '.pyc', '.pyo', '.exe', '.dll', '.so', '.dylib',
-            '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg',
-            '.zip', '.tar', '.gz', '.rar', '.7z',
-            '.mp3', '.mp4', '.avi', '.mov', '.pdf'
-        }
+        # 限制搜索文件数量
+        max_files = _MAX_SEARCH_FILES
+
+        # 优先复用缓存的文件列表；未命中时惰性遍历，文件按批取出，
+        # 凑够 max_results 后不再继续遍历目录树
+        filelist_key = (repo_path, search_path, file_pattern or "")
+        fingerprint = _repo_fingerprint(repo_path)
+        cached_files = _get_cached_filelist(filelist_key, fingerprint)
+        if cached_files is not None:
+            file_iter = iter(cached_files)
+            walked = None
+        else:
+            file_iter = self._iter_files_to_search(search_path, name_re)
+            walked = []
+        walk_complete = False
 
-        if os.path.isfile(search_path):
-            return [search_path]
+        # 并发搜索文件
+        results = []
+        total_matches = 0
+        files_scanned = 0
+        files_total = 0
+
+        # 必需字面量：文件中不含该字面量时无需运行正则
+        prefilter = _required_literal(regex)
+
+        concurrency = _THREAD_POOL_WORKERS
+
+        while files_total < max_files and total_matches < max_results:
+            # 每轮为每个工作者准备一批文件
+            wanted = min(_SEARCH_BATCH_SIZE * concurrency, max_files - files_total)
+            if walked is None:
+                files = _take(file_iter, wanted)
+            else:
+                # 目录遍历放入线程池，避免阻塞事件循环
+                files = await loop.run_in_executor(self._executor, _take, file_iter, wanted)
+                walked.extend(files)
+                walk_complete = len(files) < wanted
+            if not files:
+                break
+            files_total += len(files)
+
+            # 按连续分块提交，保持结果的文件顺序
+            batches = [
+                files[i:i + _SEARCH_BATCH_SIZE]
+                for i in range(0, len(files), _SEARCH_BATCH_SIZE)
+            ]
+            batch_args = (
+                regex,
+                repo_path,
+                min(10, max_results),  # 每个文件最多10个结果
+                max_results - total_matches,
+                prefilter
+            )
 
-        for root, dirs, filenames in os.walk(search_path):
-            # 过滤忽略的目录
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            # 创建搜索任务
+            tasks = [
+                asyncio.ensure_future(
+                    loop.run_in_executor(self._executor, _search_file_batch, batch, *batch_args)
+                )
+                for batch in batches
+            ]
+            task_index = {task: i for i, task in enumerate(tasks)}
+
+            # 按完成顺序等待，按文件顺序合并：已合并的前缀凑够 max_results 后
+            # 立即取消尚未开始的批次，不再为会被丢弃的结果付出 CPU/IO
+            pending = set(tasks)
+            finished = {}
+            next_batch = 0
+            while pending and total_matches < max_results:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    finished[task_index[task]] = task
+
+                while next_batch in finished and total_matches < max_results:
+                    task = finished.pop(next_batch)
+                    next_batch += 1
+
+                    if task.exception() is not None:
+                        # 忽略单批的错误
+                        continue
+                    batch_results = task.result()
 
-            for filename in filenames:
-                # 检查扩展名
-                _, ext = os.path.splitext(filename)
-                if ext.lower() in ignore_extensions:
-                    continue
+                    for matches in batch_results:
+                        if total_matches >= max_results:
+                            break
 
-                # 检查文件名模式
-                if file_pattern:
-                    if not self._matches_file_pattern(filename, file_pattern):
-                        continue
+                        if matches:
+                            results.extend(matches)
+                            total_matches += len(matches)
+                            files_scanned += 1
 
-                file_path = os.path.join(root, filename)
-                files.append(file_path)
+            for task in pending:
+                task.cancel()
 
-        return files
+        # 目录已遍历完或已取满 max_files 时文件列表是完整的，可以缓存；
+        # 因凑够结果而提前停止的部分列表不缓存
+        if walked is not None and (walk_complete or files_total >= max_files):
+            _set_cached_filelist(filelist_key, walked, fingerprint)
 
-    def _matches_file_pattern(self, filename: str, pattern: str) -> bool:
-        """检查文件名是否匹配模式"""
-        # 简单的通配符匹配
-        import fnmatch
-        return fnmatch.fnmatch(filename, pattern)
+        return results, files_scanned, files_total, concurrency
 
-    def _search_in_file(
+    async def _search_with_ripgrep(
         self,
-        file_path: str,
-        regex: re.Pattern,
+        pattern: str,
+        search_path: str,
+        file_pattern: str,
+        case_sensitive: bool,
         repo_path: str,
-        max_matches: int
-    ) -> List[Dict[str, Any]]:
-        """在单个文件中搜索 - 优化版本"""
-        matches = []
+        max_results: int
+    ) -> Optional[tuple]:
+        """使用 ripgrep 搜索
+
+        Returns:
+            (匹配列表, 命中文件数, 搜索文件总数)；搜索文件总数取自 ripgrep 的统计摘要，
+            因凑够结果提前终止时为 None；ripgrep 执行失败（如正则语法不兼容）时返回 None
+        """
+        args = [
+            _RG_PATH, '--json', '--line-number', '--column', '--no-messages',
+            '--sort', 'path',  # 按路径排序输出，结果顺序和提前截断的位置都是确定的
+            '--max-count', str(min(10, max_results)),  # 每个文件最多10个结果
+            '--max-filesize', str(_MAX_FILE_SIZE)
+        ]
+        if not case_sensitive:
+            args.append('--ignore-case')
+        if file_pattern:
+            args.extend(['--glob', file_pattern])
+        # 忽略规则放在文件名模式之后：ripgrep 中后出现的 glob 优先
+        args.extend(_RG_IGNORE_ARGS)
+        args.extend(['-e', pattern, '--', search_path])
 
         try:
-            # 文件大小检查：跳过过大的文件（>1MB）
-            file_size = os.path.getsize(file_path)
-            if file_size > 1_000_000:
-                logger.debug(f"跳过过大文件: {file_path} ({file_size} bytes)")
-                return matches
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=_RG_LINE_LIMIT
+            )
+        except OSError as e:
+            logger.warning(f"启动 ripgrep 失败，回退到 Python 搜索: {e}")
+            return None
 
-            # 优化编码检测：优先 UTF-8，失败后尝试其他编码
-            content = None
+        results = []
+        files = set()
+        files_total = None
+        truncated = False
 
-            for encoding in ['utf-8', 'latin-1']:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
+        try:
+            async for raw_line in proc.stdout:
+                event = json.loads(raw_line)
+                event_type = event.get("type")
+                if event_type == "summary":
+                    # --json 输出结束时的统计摘要：searches 为实际搜索的文件数
+                    files_total = event["data"].get("stats", {}).get("searches")
+                    continue
+                if event_type != "match":
                     continue
 
-            if content is None:
-                return matches
-
-            # 搜索匹配
-            relative_path = os.path.relpath(file_path, repo_path).replace('\\', '/')
+                data = event["data"]
+                path_text = data["path"].get("text")
+                line_text = data["lines"].get("text")
+                if path_text is None or line_text is None:
+                    # 非 UTF-8 路径或内容，跳过
+                    continue
 
-            # 优化：逐行搜索，提前退出
-            for line_num, line in enumerate(content.split('\n'), 1):
-                if len(matches) >= max_matches:
+                relative_path = os.path.relpath(path_text, repo_path).replace('\\', '/')
+                if relative_path not in files and len(files) >= _MAX_SEARCH_FILES:
+                    # 与 Python 搜索相同的文件数上限（ripgrep 无法限制搜索的文件数，按命中文件计）
+                    truncated = True
                     break
+                line_bytes = line_text.encode('utf-8')
 
-                # 快速预检查：避免不必要的正则匹配
-                if not regex.search(line):
-                    continue
-
-                # 精确匹配位置
-                for match in regex.finditer(line):
-                    matches.append({
+                for submatch in data["submatches"]:
+                    match_text = submatch["match"].get("text")
+                    if match_text is None:
+                        continue
+                    results.append({
                         "file": relative_path,
-                        "line": line_num,
-                        "column": match.start() + 1,
-                        "match": match.group(),
-                        "context": line.strip()
+                        "line": data["line_number"],
+                        # ripgrep 给出的是字节偏移，转换为字符列号
+                        "column": len(line_bytes[:submatch["start"]].decode('utf-8', errors='replace')) + 1,
+                        "match": match_text,
+                        "context": line_text.strip()
                     })
+                    files.add(relative_path)
 
-                    if len(matches) >= max_matches:
+                    if len(results) >= max_results:
+                        truncated = True
                         break
 
-        except Exception as e:
-            logger.warning(f"读取文件失败: {file_path}, 错误: {e}")
+                if truncated:
+                    break
+
+            if not truncated:
+                await proc.wait()
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            # 超长输出行或无法解析的 JSON（json.JSONDecodeError 是 ValueError 的子类）
+            logger.warning(f"解析 ripgrep 输出失败，回退到 Python 搜索: {e}")
+            return None
+        finally:
+            # 提前停止读取（截断、异常或取消）时 ripgrep 可能仍阻塞在写满的管道上，必须结束进程
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+
+        # 退出码：0 有匹配，1 无匹配，2 出错
+        if not truncated and proc.returncode not in (0, 1):
+            logger.info(f"ripgrep 执行失败（退出码 {proc.returncode}），回退到 Python 搜索")
+            return None
+
+        return results, len(files), files_total
+
+    def _iter_files_to_search(
+        self,
+        search_path: str,
+        name_re: Optional["re.Pattern[str]"]
+    ) -> Iterator[str]:
+        """惰性产出要搜索的文件路径"""
+
+        if os.path.isfile(search_path):
+            yield search_path
+            return
+
+        # 基于 os.scandir 的显式栈深度优先遍历：直接使用 DirEntry 缓存的类型信息，
+        # 避免 os.walk 额外的 stat 调用以及逐个文件的 os.path.join/splitext
+        stack = [search_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # 过滤忽略的目录
+                        if name not in _IGNORE_DIRS:
+                            subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+
+                # 检查扩展名（与 os.path.splitext 一致，忽略以点开头的文件名）
+                dot = name.rfind('.')
+                if dot > 0 and name[dot:].lower() in _IGNORE_EXTENSIONS:
+                    continue
+
+                # 检查文件名模式
+                if name_re is not None and name_re.match(name) is None:
+                    continue
+
+                yield entry.path
 
-        return matches
+            # 逆序入栈，保持与 os.walk 相同的先序遍历顺序
+            stack.extend(reversed(subdirs))
 
     def __del__(self):
         """清理资源"""
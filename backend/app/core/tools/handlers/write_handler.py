@@ -5,17 +5,31 @@
 
 import os
 import re
+import asyncio
+import threading
+import stat
+import codecs
+import tempfile
+import bisect
+import functools
+import itertools
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
+from collections import OrderedDict
 import logging
 
 from ..base import ToolSpec, ToolParameter, ToolContext
 from ..handler import BaseToolHandler
+from .search_handler import invalidate_file_list
 
 
 logger = logging.getLogger(__name__)
 
 
+# 进程的文件创建掩码（os.umask 只能通过设置来读取，在导入时读取一次）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 # SEARCH/REPLACE 块标记（Cline 兼容格式）
 SEARCH_BLOCK_START = "------- SEARCH"
 SEARCH_BLOCK_END = "======="
@@ -26,6 +40,15 @@ SEARCH_BLOCK_START_REGEX = re.compile(r'^[-]{3,}\s*SEARCH\s*?$')
 SEARCH_BLOCK_END_REGEX = re.compile(r'^[=]{3,}$')
 REPLACE_BLOCK_END_REGEX = re.compile(r'^[+]{3,}\s*REPLACE\s*?$')
 
+# 在整个 diff 中一次性查找所有标记行（与上面三个正则逐行匹配的规则相同，
+# 用 [^\S\n] 代替 \s，避免在 MULTILINE 模式下跨行匹配）
+DIFF_MARKER_REGEX = re.compile(
+    r'^(?:(?P<search>[-]{3,}[^\S\n]*SEARCH[^\S\n]*?)'
+    r'|(?P<divider>[=]{3,})'
+    r'|(?P<replace>[+]{3,}[^\S\n]*REPLACE[^\S\n]*?))$',
+    re.MULTILINE
+)
+
 
 @dataclass
 class DiffBlock:
@@ -47,6 +70,154 @@ class DiffStats:
     bytes_removed: int
 
 
+def _resolve_repo_file(context: ToolContext, file_path: str) -> str:
+    """将相对路径解析为仓库内的绝对路径，路径不在仓库内时抛出 ValueError"""
+    full_path = context.resolve_repo_path(file_path)
+    if full_path is None:
+        raise ValueError(f"非法文件路径: {file_path}")
+    return full_path
+
+
+def _write_file_atomic(full_path: str, data: bytes) -> None:
+    """原子写入文件：先写入同目录下的临时文件，再用 os.replace 替换目标文件
+
+    写入中途失败或进程崩溃时不会留下只写了一半的文件。
+    目标为符号链接时替换其指向的文件；已有文件保留原权限位，新文件按 umask 设置权限。
+    """
+    target = os.path.realpath(full_path)
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target),
+        prefix=f".{os.path.basename(target)}.",
+        suffix=".tmp"
+    )
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_text_file(full_path: str, content: str) -> None:
+    """以 UTF-8 编码原子写入文本（与文本模式一致，按平台换行符写入）"""
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    _write_file_atomic(full_path, content.encode('utf-8'))
+
+
+# 带 BOM 的编码（UTF-32 的 BOM 以 UTF-16 LE 的 BOM 开头，需先判断）
+# UTF-8 BOM 仍按 utf-8 解码并保留在内容中，写回时不丢失
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# 无 BOM 时依次尝试的编码（gbk 是 gb2312 的超集，gbk 解码失败时 gb2312 必然失败）
+_FALLBACK_ENCODINGS = ('utf-8', 'gbk', 'latin-1')
+
+
+# 已检测出的文件编码缓存：文件路径 -> (修改时间 ns, 编码)
+# 文件未修改时直接使用上次成功的编码，非 UTF-8 文件无需每次先尝试 UTF-8 失败
+_encoding_cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+_encoding_cache_max_size = 256
+_encoding_cache_lock = threading.Lock()
+
+
+def _detect_encodings(raw: bytes) -> Tuple[str, ...]:
+    """根据文件开头的 BOM 返回候选编码列表"""
+    for bom, encoding in _BOM_ENCODINGS:
+        if raw.startswith(bom):
+            return (encoding,) + _FALLBACK_ENCODINGS
+    return _FALLBACK_ENCODINGS
+
+
+def _read_file_with_encoding(file_path: str) -> Optional[str]:
+    """使用多种编码读取文件
+
+    只读取一次文件字节，再在内存中依次尝试候选编码；
+    换行符按文本模式的规则统一转换为 '\\n'。
+    """
+    with open(file_path, 'rb') as f:
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        raw = f.read()
+
+    encodings = _detect_encodings(raw)
+    cached = _encoding_cache.get(file_path)
+    if cached is not None and cached[0] == mtime_ns:
+        encodings = (cached[1],) + encodings
+
+    for encoding in encodings:
+        try:
+            text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+
+        # 读取可能在线程池中并发执行，更新缓存时加锁
+        with _encoding_cache_lock:
+            if file_path not in _encoding_cache and len(_encoding_cache) >= _encoding_cache_max_size:
+                _encoding_cache.popitem(last=False)
+            _encoding_cache[file_path] = (mtime_ns, encoding)
+            _encoding_cache.move_to_end(file_path)
+
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    return None
+
+
+class _LineIndex:
+    """文件内容的按行索引，各字段首次使用时才计算
+
+    多个 SEARCH 块依次匹配同一份内容时共享，避免每个块、每种匹配策略
+    都重新 split 整个文件并重新 strip 每一行。
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+
+    @functools.cached_property
+    def lines(self) -> List[str]:
+        return self.content.split('\n')
+
+    @functools.cached_property
+    def trimmed(self) -> List[str]:
+        """去除首尾空白后的各行"""
+        return [line.strip() for line in self.lines]
+
+    @functools.cached_property
+    def offsets(self) -> List[int]:
+        """每一行的起始字符偏移量
+
+        共 len(lines) + 1 个元素，最后一个为末行之后的位置（末行也按带换行符计算），
+        第 i 行至第 j 行（不含）的范围即 offsets[i]:offsets[j]。
+        """
+        return list(itertools.accumulate((len(line) + 1 for line in self.lines), initial=0))
+
+    def line_at(self, index: int) -> int:
+        """返回字符偏移量 index 所在的行号（二分查找）"""
+        return bisect.bisect_right(self.offsets, index) - 1
+
+    def first_line_from(self, index: int) -> int:
+        """返回起始偏移量不小于 index 的第一行的行号（二分查找）"""
+        return bisect.bisect_left(self.offsets, index)
+
+
 class WriteToFileToolHandler(BaseToolHandler):
     """
     写入文件工具处理器 - 增强版
@@ -134,25 +305,70 @@ class WriteToFileToolHandler(BaseToolHandler):
         max_size = parameters.get("max_size", self.DEFAULT_MAX_FILE_SIZE)
         repo_path = context.repository_path
 
-        # 构建完整文件路径
-        full_path = os.path.join(repo_path, file_path)
-
-        # 安全检查：确保文件在仓库内
-        if not os.path.abspath(full_path).startswith(os.path.abspath(repo_path)):
-            raise ValueError(f"非法文件路径: {file_path}")
+        # 构建完整文件路径（安全检查：确保文件在仓库内）
+        full_path = _resolve_repo_file(context, file_path)
 
         # 检查内容大小
-        content_size = len(content.encode('utf-8'))
+        data = content.encode('utf-8')
+        content_size = len(data)
         if max_size > 0 and content_size > max_size:
             raise ValueError(
                 f"内容过大 ({content_size} 字节)，超过最大限制 ({max_size} 字节)"
             )
 
-        # 如果文件已存在，读取旧内容用于对比
-        old_content = None
-        if os.path.exists(full_path):
+        # 文件读写、建目录等阻塞 I/O 放到线程池执行，避免大文件或慢磁盘阻塞事件循环
+        loop = asyncio.get_event_loop()
+        existed, old_size, lines_removed, written_size = await loop.run_in_executor(
+            None, self._write_file_sync, full_path, file_path, content, data, create_directories
+        )
+
+        # 新建文件会改变目录内容，清除搜索工具的文件列表缓存
+        if not existed:
+            invalidate_file_list(repo_path)
+
+        # 获取文件统计信息（写入的字节数即文件大小，无需再 stat）
+        lines_added = content.count('\n') + 1 if content else 0
+
+        return {
+            "file_path": file_path,
+            "action": "updated" if existed else "created",
+            "size": written_size,
+            "old_size": old_size,
+            "new_size": content_size,
+            "size_change": content_size - old_size,
+            "relative_path": file_path,
+            "stats": {
+                "lines_added": lines_added,
+                "lines_removed": lines_removed,
+                "lines_changed": max(lines_added, lines_removed)
+            }
+        }
+
+    def _write_file_sync(
+        self,
+        full_path: str,
+        file_path: str,
+        content: str,
+        data: bytes,
+        create_directories: bool
+    ) -> Tuple[bool, int, int, int]:
+        """在工作线程中执行的同步写入流程
+
+        Returns:
+            (文件原本是否存在, 旧文件大小, 旧文件行数, 写入字节数)
+        """
+        content_size = len(data)
+
+        # 如果文件已存在，通过 stat 获取旧文件大小，只按字节统计旧内容行数（无需解码）
+        existed = os.path.exists(full_path)
+        old_size = 0
+        lines_removed = 0
+        if existed:
             try:
-                old_content = self._read_file_with_encoding(full_path)
+                old_size = os.stat(full_path).st_size
+                if old_size:
+                    with open(full_path, 'rb') as f:
+                        lines_removed = f.read().count(b'\n') + 1
             except Exception as e:
                 logger.warning(f"读取现有文件失败: {e}")
 
@@ -163,10 +379,13 @@ class WriteToFileToolHandler(BaseToolHandler):
         # 创建所需目录
         if create_directories:
             directory = os.path.dirname(full_path)
-            if directory and not os.path.exists(directory):
+            if directory:
+                # 直接创建，目录已存在时由 FileExistsError 得知，省去一次 exists 探测
                 try:
-                    os.makedirs(directory, exist_ok=True)
+                    os.makedirs(directory)
                     logger.info(f"创建目录: {directory}")
+                except FileExistsError:
+                    pass
                 except Exception as e:
                     raise ValueError(f"创建目录失败: {directory}, 错误: {e}")
 
@@ -185,29 +404,10 @@ class WriteToFileToolHandler(BaseToolHandler):
 
         # 写入文件
         try:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-
-            # 获取文件统计信息
-            file_stats = os.stat(full_path)
-            lines_added = content.count('\n') + 1 if content else 0
-            lines_removed = old_content.count('\n') + 1 if old_content else 0
-
-            return {
-                "file_path": file_path,
-                "action": "created" if old_content is None else "updated",
-                "size": file_stats.st_size,
-                "old_size": len(old_content.encode('utf-8')) if old_content else 0,
-                "new_size": content_size,
-                "size_change": content_size - (len(old_content.encode('utf-8')) if old_content else 0),
-                "relative_path": file_path,
-                "stats": {
-                    "lines_added": lines_added,
-                    "lines_removed": lines_removed,
-                    "lines_changed": max(lines_added, lines_removed) if old_content else lines_added
-                }
-            }
-
+            # 与文本模式写入一致，按平台换行符写入
+            if os.linesep != '\n':
+                data = content.replace('\n', os.linesep).encode('utf-8')
+            _write_file_atomic(full_path, data)
         except PermissionError:
             raise ValueError(f"权限不足，无法写入文件: {file_path}")
         except OSError as e:
@@ -216,15 +416,7 @@ class WriteToFileToolHandler(BaseToolHandler):
             logger.error(f"写入文件失败: {file_path}, 错误: {e}")
             raise
 
-    def _read_file_with_encoding(self, file_path: str) -> Optional[str]:
-        """使用多种编码读取文件"""
-        for encoding in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
-        return None
+        return existed, old_size, lines_removed, len(data)
 
 
 class ReplaceInFileToolHandler(BaseToolHandler):
@@ -310,18 +502,15 @@ class ReplaceInFileToolHandler(BaseToolHandler):
         diff_content = parameters["diff"]
         repo_path = context.repository_path
 
-        # 构建完整文件路径
-        full_path = os.path.join(repo_path, file_path)
-
-        # 安全检查
-        if not os.path.abspath(full_path).startswith(os.path.abspath(repo_path)):
-            raise ValueError(f"非法文件路径: {file_path}")
+        # 构建完整文件路径（安全检查）
+        full_path = _resolve_repo_file(context, file_path)
 
         if not os.path.exists(full_path):
             raise ValueError(f"文件不存在: {file_path}")
 
-        # 读取文件内容
-        content = self._read_file_with_encoding(full_path)
+        # 读取文件内容（磁盘 I/O 放入线程池，避免阻塞事件循环）
+        loop = asyncio.get_event_loop()
+        content = await loop.run_in_executor(None, _read_file_with_encoding, full_path)
         if content is None:
             raise ValueError(f"无法解码文件: {file_path}")
 
@@ -357,8 +546,7 @@ class ReplaceInFileToolHandler(BaseToolHandler):
 
         # 写入文件
         try:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            await loop.run_in_executor(None, _write_text_file, full_path, new_content)
         except Exception as e:
             logger.error(f"写入文件失败: {file_path}, 错误: {e}")
             raise
@@ -381,68 +569,69 @@ class ReplaceInFileToolHandler(BaseToolHandler):
             }
         }
 
-    def _read_file_with_encoding(self, file_path: str) -> Optional[str]:
-        """使用多种编码读取文件"""
-        for encoding in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
-        return None
-
     def _parse_diff_blocks(self, diff_content: str) -> List[DiffBlock]:
-        """解析 SEARCH/REPLACE 块"""
+        """解析 SEARCH/REPLACE 块
+
+        用正则在 C 层一次性定位标记行，只对标记行运行状态机，
+        标记之间的内容直接切片得到，不逐行拆分和拼接。
+        """
         blocks = []
-        lines = diff_content.split('\n')
 
-        current_search = []
-        current_replace = []
         in_search = False
         in_replace = False
+        search_content = ''
+        search_has_lines = False
         search_line_start = -1
         replace_line_start = -1
 
-        for line_num, line in enumerate(lines, 1):
-            # 检查 SEARCH 块开始
-            if SEARCH_BLOCK_START_REGEX.match(line):
+        # 当前段内容的起始偏移量（上一个标记行之后）
+        section_start = 0
+        line_num = 1
+        counted_to = 0
+
+        for match in DIFF_MARKER_REGEX.finditer(diff_content):
+            kind = match.lastgroup
+
+            # 不在对应状态下的分隔线/结束标记按普通内容处理
+            if (kind == 'divider' and not in_search) or (kind == 'replace' and not in_replace):
+                continue
+
+            marker_start = match.start()
+            line_num += diff_content.count('\n', counted_to, marker_start)
+            counted_to = marker_start
+
+            # 上一个标记行与当前标记行之间的内容（可能为零行）
+            has_lines = marker_start > section_start
+            section = diff_content[section_start:marker_start - 1] if has_lines else ''
+            section_start = match.end() + 1
+
+            if kind == 'search':
+                # SEARCH 块开始
                 in_search = True
                 in_replace = False
                 search_line_start = line_num + 1
-                current_search = []
-                current_replace = []
-                continue
-
-            # 检查 SEARCH 块结束（REPLACE 块开始）
-            if SEARCH_BLOCK_END_REGEX.match(line) and in_search:
+            elif kind == 'divider':
+                # SEARCH 块结束（REPLACE 块开始）
                 in_search = False
                 in_replace = True
+                search_content = section
+                search_has_lines = has_lines
                 replace_line_start = line_num + 1
-                continue
-
-            # 检查 REPLACE 块结束
-            if REPLACE_BLOCK_END_REGEX.match(line) and in_replace:
+            else:
+                # REPLACE 块结束，保存当前块
                 in_replace = False
-                # 保存当前块
                 blocks.append(DiffBlock(
-                    search_content='\n'.join(current_search),
-                    replace_content='\n'.join(current_replace),
+                    search_content=search_content,
+                    replace_content=section,
                     search_line_start=search_line_start,
                     replace_line_start=replace_line_start
                 ))
-                continue
-
-            # 收集内容
-            if in_search:
-                current_search.append(line)
-            elif in_replace:
-                current_replace.append(line)
 
         # 处理最后一个块（如果没有结束标记）
-        if in_replace and current_search:
+        if in_replace and search_has_lines:
             blocks.append(DiffBlock(
-                search_content='\n'.join(current_search),
-                replace_content='\n'.join(current_replace),
+                search_content=search_content,
+                replace_content=diff_content[section_start:],
                 search_line_start=search_line_start,
                 replace_line_start=replace_line_start
             ))
@@ -455,8 +644,12 @@ class ReplaceInFileToolHandler(BaseToolHandler):
         diff_blocks: List[DiffBlock],
         file_path: str
     ) -> Tuple[str, DiffStats]:
-        """应用所有替换块"""
-        result = content
+        """应用所有替换块
+
+        所有块都在原始内容上依次向后匹配，先收集 (起点, 终点, 替换内容)，
+        最后一次性拼接出新内容，避免每个块都复制整个文件。
+        """
+        edits: List[Tuple[int, int, str]] = []
         last_processed_index = 0
         stats = DiffStats(
             blocks_processed=0,
@@ -467,15 +660,19 @@ class ReplaceInFileToolHandler(BaseToolHandler):
             bytes_removed=0
         )
 
+        # 原始内容不变，行索引在所有块之间复用
+        line_index = _LineIndex(content)
+
         for block_idx, block in enumerate(diff_blocks, 1):
             search_content = block.search_content
             replace_content = block.replace_content
 
-            logger.info(f"处理块 {block_idx}/{len(diff_blocks)}")
+            # 逐块日志使用惰性格式化，日志级别未开启时不构造字符串
+            logger.info("处理块 %d/%d", block_idx, len(diff_blocks))
 
-            # 尝试匹配搜索内容
+            # 尝试匹配搜索内容（从上一个块的匹配终点之后开始）
             match_start, match_end = self._find_match(
-                result, search_content, last_processed_index
+                line_index, search_content, last_processed_index
             )
 
             if match_start == -1:
@@ -499,25 +696,30 @@ class ReplaceInFileToolHandler(BaseToolHandler):
             stats.bytes_added += len(replace_content)
             stats.lines_changed += max(search_lines, replace_lines)
 
-            # 执行替换
-            result = (
-                result[:match_start] +
-                replace_content +
-                result[match_end:]
-            )
+            # 记录替换
+            edits.append((match_start, match_end, replace_content))
 
             # 更新处理位置
-            last_processed_index = match_start + len(replace_content)
+            last_processed_index = match_end
             stats.blocks_processed += 1
 
-            logger.info(f"块 {block_idx} 替换成功: "
-                       f"删除 {search_lines} 行, 添加 {replace_lines} 行")
+            logger.info("块 %d 替换成功: 删除 %d 行, 添加 %d 行",
+                        block_idx, search_lines, replace_lines)
 
-        return result, stats
+        # 一次性拼接替换结果
+        parts = []
+        position = 0
+        for match_start, match_end, replace_content in edits:
+            parts.append(content[position:match_start])
+            parts.append(replace_content)
+            position = match_end
+        parts.append(content[position:])
+
+        return ''.join(parts), stats
 
     def _find_match(
         self,
-        content: str,
+        line_index: _LineIndex,
         search_content: str,
         start_index: int
     ) -> Tuple[int, int]:
@@ -532,20 +734,29 @@ class ReplaceInFileToolHandler(BaseToolHandler):
         返回: (match_start, match_end) 或 (-1, -1)
         """
 
-        # 策略 1: 精确匹配
-        exact_index = content.find(search_content, start_index)
+        # 策略 1: 精确匹配（最常见，只需一次 C 层子串搜索，命中后不再切分搜索内容）
+        exact_index = line_index.content.find(search_content, start_index)
         if exact_index != -1:
             return exact_index, exact_index + len(search_content)
 
+        # 后续策略共用同一份切分、修剪后的搜索行
+        search_lines = search_content.split('\n')
+        is_multiline_block = len(search_lines) >= 3
+
+        # 移除末尾空行
+        if search_lines[-1] == '':
+            search_lines.pop()
+
+        search_trimmed = [line.strip() for line in search_lines]
+
         # 策略 2: 行修剪匹配
-        line_match = self._line_trimmed_match(content, search_content, start_index)
+        line_match = self._line_trimmed_match(line_index, search_trimmed, start_index)
         if line_match:
             return line_match
 
         # 策略 3: 块锚定匹配（仅对3行以上的块）
-        search_lines = search_content.split('\n')
-        if len(search_lines) >= 3:
-            block_match = self._block_anchor_match(content, search_content, start_index)
+        if is_multiline_block:
+            block_match = self._block_anchor_match(line_index, search_trimmed, start_index)
             if block_match:
                 return block_match
 
@@ -554,102 +765,74 @@ class ReplaceInFileToolHandler(BaseToolHandler):
 
     def _line_trimmed_match(
         self,
-        content: str,
-        search_content: str,
+        line_index: _LineIndex,
+        search_trimmed: List[str],
         start_index: int
     ) -> Optional[Tuple[int, int]]:
-        """行修剪匹配 - 忽略每行首尾空格"""
-        content_lines = content.split('\n')
-        search_lines = search_content.split('\n')
-
-        # 移除末尾空行
-        if search_lines and search_lines[-1] == '':
-            search_lines.pop()
+        """行修剪匹配 - 忽略每行首尾空格
 
-        # 找到 start_index 对应的行号
-        current_pos = 0
-        start_line = 0
-        for i, line in enumerate(content_lines):
-            current_pos += len(line) + 1  # +1 for '\n'
-            if current_pos > start_index:
-                start_line = i
-                break
-
-        # 尝试匹配
-        for i in range(start_line, len(content_lines) - len(search_lines) + 1):
-            match = True
-            for j in range(len(search_lines)):
-                content_trimmed = content_lines[i + j].strip()
-                search_trimmed = search_lines[j].strip()
-                if content_trimmed != search_trimmed:
-                    match = False
+        search_trimmed 为已移除末尾空行并逐行修剪的搜索内容
+        """
+        content_trimmed = line_index.trimmed
+
+        # 找到 start_index 之后的第一行（所在行已被上一个块占用）
+        start_line = line_index.first_line_from(start_index)
+        block_size = len(search_trimmed)
+
+        last_start = len(content_trimmed) - block_size
+
+        # 快速路径：首行非空时用 str.find（C 层子串搜索）定位候选行，只校验候选行；
+        # 修剪后与首行相等的行必然包含首行内容，因此不会漏掉匹配
+        first_line = search_trimmed[0] if search_trimmed else ''
+        if first_line:
+            content = line_index.content
+            pos = content.find(first_line, line_index.offsets[start_line])
+            while pos != -1:
+                i = line_index.line_at(pos)
+                if i > last_start:
                     break
+                if content_trimmed[i:i + block_size] == search_trimmed:
+                    return line_index.offsets[i], line_index.offsets[i + block_size]
+                pos = content.find(first_line, line_index.offsets[i + 1])
+            return None
 
-            if match:
+        # 尝试匹配
+        for i in range(start_line, last_start + 1):
+            if content_trimmed[i:i + block_size] == search_trimmed:
                 # 计算精确位置
-                match_start = 0
-                for k in range(i):
-                    match_start += len(content_lines[k]) + 1
-
-                match_end = match_start
-                for k in range(len(search_lines)):
-                    match_end += len(content_lines[i + k]) + 1
-
-                return match_start, match_end
+                return line_index.offsets[i], line_index.offsets[i + block_size]
 
         return None
 
     def _block_anchor_match(
         self,
-        content: str,
-        search_content: str,
+        line_index: _LineIndex,
+        search_trimmed: List[str],
         start_index: int
     ) -> Optional[Tuple[int, int]]:
         """
         块锚定匹配 - 使用首尾行作为锚点
 
-        适用于 3 行以上的块，通过匹配首尾行来定位块
+        适用于 3 行以上的块（由调用方判断），通过匹配首尾行来定位块；
+        search_trimmed 为已移除末尾空行并逐行修剪的搜索内容
         """
-        content_lines = content.split('\n')
-        search_lines = search_content.split('\n')
+        first_line_search = search_trimmed[0]
+        last_line_search = search_trimmed[-1]
+        block_size = len(search_trimmed)
 
-        if len(search_lines) < 3:
-            return None
-
-        # 移除末尾空行
-        if search_lines[-1] == '':
-            search_lines.pop()
-
-        first_line_search = search_lines[0].strip()
-        last_line_search = search_lines[-1].strip()
-        block_size = len(search_lines)
-
-        # 找到 start_index 对应的行号
-        current_pos = 0
-        start_line = 0
-        for i, line in enumerate(content_lines):
-            current_pos += len(line) + 1
-            if current_pos > start_index:
-                start_line = i
-                break
+        # 找到 start_index 之后的第一行（所在行已被上一个块占用）
+        content_trimmed = line_index.trimmed
+        start_line = line_index.first_line_from(start_index)
 
         # 查找匹配首尾行的块
-        for i in range(start_line, len(content_lines) - block_size + 1):
-            if content_lines[i].strip() != first_line_search:
+        for i in range(start_line, len(content_trimmed) - block_size + 1):
+            if content_trimmed[i] != first_line_search:
                 continue
 
-            if content_lines[i + block_size - 1].strip() != last_line_search:
+            if content_trimmed[i + block_size - 1] != last_line_search:
                 continue
 
             # 找到匹配，计算精确位置
-            match_start = 0
-            for k in range(i):
-                match_start += len(content_lines[k]) + 1
-
-            match_end = match_start
-            for k in range(block_size):
-                match_end += len(content_lines[i + k]) + 1
-
-            return match_start, match_end
+            return line_index.offsets[i], line_index.offsets[i + block_size]
 
         return None
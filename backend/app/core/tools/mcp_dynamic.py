@@ -9,8 +9,10 @@ MCP 动态工具注册系统
 - AI 可以直接调用，无需中间步骤
 """
 
+import asyncio
 import logging
 import json
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 from .base import ToolSpec, ToolParameter
 
@@ -23,6 +25,16 @@ logger = logging.getLogger(__name__)
 # MCP 工具名称分隔符（参考 Cline 的 CLINE_MCP_TOOL_IDENTIFIER）
 MCP_TOOL_SEPARATOR = "__mcp__"
 
+# JSON Schema 类型 -> 工具参数类型（模块级只读映射，避免每个参数转换时重新构建字典）
+_JSON_TO_TOOL_TYPE = MappingProxyType({
+    "string": "string",
+    "number": "number",
+    "integer": "integer",
+    "boolean": "boolean",
+    "array": "array",
+    "object": "object"
+})
+
 
 async def convert_mcp_tools_to_specs(
     server_name: str,
@@ -64,7 +76,7 @@ async def convert_mcp_tools_to_specs(
 
         for tool in tools:
             try:
-                spec = await _convert_single_tool(server_name, tool)
+                spec = _convert_single_tool(server_name, tool)
                 if spec:
                     tool_specs.append(spec)
                     logger.debug(f"  ✓ 转换工具: {spec.name}")
@@ -80,7 +92,7 @@ async def convert_mcp_tools_to_specs(
         return []
 
 
-async def _convert_single_tool(server_name: str, mcp_tool: Dict[str, Any]) -> Optional[ToolSpec]:
+def _convert_single_tool(server_name: str, mcp_tool: Dict[str, Any]) -> Optional[ToolSpec]:
     """
     转换单个 MCP 工具为 ToolSpec
 
@@ -159,16 +171,7 @@ def _convert_json_type_to_tool_type(json_type: str) -> str:
     Returns:
         工具类型字符串
     """
-    type_mapping = {
-        "string": "string",
-        "number": "number",
-        "integer": "integer",
-        "boolean": "boolean",
-        "array": "array",
-        "object": "object"
-    }
-
-    return type_mapping.get(json_type, "string")
+    return _JSON_TO_TOOL_TYPE.get(json_type, "string")
 
 
 def _build_enhanced_description(
@@ -191,15 +194,11 @@ def _build_enhanced_description(
     if original_desc and f"MCP 服务器 {server_name}" in original_desc:
         return original_desc
 
-    # 否则，添加 MCP 来源信息
-    enhanced = f"[MCP: {server_name}] "
-
+    # 否则，添加 MCP 来源信息（一次格式化生成，不做增量拼接）
     if original_desc:
-        enhanced += original_desc
-    else:
-        enhanced += f"调用 {server_name} 服务器的 {tool_name} 工具"
+        return f"[MCP: {server_name}] {original_desc}"
 
-    return enhanced
+    return f"[MCP: {server_name}] 调用 {server_name} 服务器的 {tool_name} 工具"
 
 
 def parse_dynamic_tool_name(tool_name: str) -> Optional[tuple[str, str]]:
@@ -212,10 +211,10 @@ def parse_dynamic_tool_name(tool_name: str) -> Optional[tuple[str, str]]:
     Returns:
         (server_name, mcp_tool_name) 元组，如果不是 MCP 工具返回 None
     """
-    if MCP_TOOL_SEPARATOR in tool_name:
-        parts = tool_name.split(MCP_TOOL_SEPARATOR, 1)
-        if len(parts) == 2:
-            return (parts[0], parts[1])
+    # partition 一次扫描即可同时完成查找和切分
+    server_name, separator, mcp_tool_name = tool_name.partition(MCP_TOOL_SEPARATOR)
+    if separator:
+        return (server_name, mcp_tool_name)
 
     return None
 
@@ -236,12 +235,16 @@ async def register_all_mcp_tools(
     Returns:
         注册的工具总数
     """
+    # 在函数内导入：mcp_dynamic_handler 依赖本模块的 parse_dynamic_tool_name，模块顶层导入会循环引用
+    from .handlers.mcp_dynamic_handler import DynamicMcpToolHandler
+
     total_registered = 0
 
     try:
         # 1. 获取所有已连接的服务器（实际运行中的）
-        # 🔥 关键：直接检查 _active_clients，不依赖配置文件
-        active_servers = mcp_manager._active_clients.keys()
+        # 🔥 关键：直接检查实际运行中的客户端，不依赖配置文件
+        # 使用不可变快照：并发转换期间服务器可能启动/停止
+        active_servers = mcp_manager.active_server_names
 
         if not active_servers:
             logger.warning("⚠️ 没有运行中的 MCP 服务器")
@@ -249,29 +252,26 @@ async def register_all_mcp_tools(
 
         logger.info(f"发现 {len(active_servers)} 个运行中的 MCP 服务器")
 
-        # 2. 遍历每个运行中的服务器
-        for server_name in active_servers:
-            logger.info(f"正在注册 MCP 服务器 {server_name} 的工具...")
-
-            try:
-                # 3. 转换工具为 ToolSpec
-                tool_specs = await convert_mcp_tools_to_specs(server_name, mcp_manager)
-
-                # 4. 注册到 ToolCoordinator
-                for spec in tool_specs:
-                    # 创建动态处理器
-                    from .handlers.mcp_dynamic_handler import DynamicMcpToolHandler
-                    handler = DynamicMcpToolHandler(spec)
+        # 2. 并发转换所有服务器的工具（每个服务器的状态查询和工具列表都是 I/O 往返，
+        #    并发后启动耗时取决于最慢的服务器，而不是所有服务器之和）
+        all_tool_specs = await asyncio.gather(
+            *(convert_mcp_tools_to_specs(server_name, mcp_manager) for server_name in active_servers),
+            return_exceptions=True
+        )
 
-                    # 注册
-                    tool_coordinator.register(handler)
-                    total_registered += 1
+        # 3. 为每个工具创建动态处理器
+        handlers = []
+        for server_name, tool_specs in zip(active_servers, all_tool_specs):
+            if isinstance(tool_specs, BaseException):
+                logger.error(f"注册 {server_name} 工具失败: {tool_specs}", exc_info=tool_specs)
+                continue
 
-                logger.info(f"✅ {server_name}: 注册了 {len(tool_specs)} 个工具")
+            handlers.extend(DynamicMcpToolHandler(spec) for spec in tool_specs)
+            logger.info(f"✅ {server_name}: 注册了 {len(tool_specs)} 个工具")
 
-            except Exception as e:
-                logger.error(f"注册 {server_name} 工具失败: {e}", exc_info=True)
-                continue
+        # 4. 批量注册到 ToolCoordinator
+        tool_coordinator.register_many(handlers)
+        total_registered = len(handlers)
 
         logger.info(f"✅ MCP 动态工具注册完成，共注册 {total_registered} 个工具")
         return total_registered
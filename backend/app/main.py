@@ -29,18 +29,73 @@ from app.core.database import init_db
 logger = logging.getLogger(__name__)
 
 
+# 应用启动时同时启动的 MCP 服务器数上限（每个服务器对应一个子进程）
+_MCP_STARTUP_CONCURRENCY = 8
+
+
+async def _start_mcp_server(
+    mcp_manager: MCPServerManager,
+    server_name: str,
+    semaphore: asyncio.Semaphore
+):
+    """启动单个 MCP 服务器并输出其状态"""
+    async with semaphore:
+        try:
+            print(f"🚀 正在启动 MCP 服务器: {server_name}")
+            logger.info(f"Starting MCP server: {server_name}")
+            success = await mcp_manager.start_server(server_name)
+            print(f"   {server_name} 启动结果: {success}")
+
+            if success:
+                # 获取服务器状态
+                status = await mcp_manager.get_server_status(server_name)
+                connected = status.get("connected", False)
+                print(f"   {server_name} 连接状态: {connected}")
+
+                if connected:
+                    # 并发获取工具列表和资源列表
+                    tools, resources = await asyncio.gather(
+                        mcp_manager.list_tools(server_name),
+                        mcp_manager.list_resources(server_name)
+                    )
+                    tool_count = len(tools) if tools else 0
+                    resource_count = len(resources) if resources else 0
+
+                    result_msg = (
+                        f"✅ MCP server '{server_name}' started successfully "
+                        f"({tool_count} tools, {resource_count} resources)"
+                    )
+                    print(f"   {result_msg}")
+                    logger.info(result_msg)
+                else:
+                    warn_msg = f"⚠️ MCP server '{server_name}' started but not connected"
+                    print(f"   {warn_msg}")
+                    logger.warning(warn_msg)
+            else:
+                error_msg = f"❌ Failed to start MCP server: {server_name}"
+                print(f"   {error_msg}")
+                logger.warning(error_msg)
+
+        except Exception as e:
+            logger.error(f"Failed to start MCP server '{server_name}': {e}", exc_info=True)
+
+
 async def _initialize_mcp_servers(mcp_manager: MCPServerManager):
     """
     初始化并启动所有已启用的 MCP 服务器
 
     🔥 正确逻辑：只启动配置中 enabled=true 的服务器
     配置文件中的 enabled 状态由前端管理，反映用户的意图
+
+    各服务器并发启动（最多 _MCP_STARTUP_CONCURRENCY 个同时进行），
+    启动耗时取决于最慢的服务器，而不是所有服务器之和
     """
     try:
         servers = mcp_manager.list_servers()
         print(f"📋 发现 {len(servers)} 个配置的 MCP 服务器")
         logger.info(f"Found {len(servers)} configured MCP servers")
 
+        enabled_servers = []
         for server_name, config in servers.items():
             # 🔥 关键：只启动用户启用的服务器（enabled=true）
             enabled = config.get("enabled", True)
@@ -50,44 +105,13 @@ async def _initialize_mcp_servers(mcp_manager: MCPServerManager):
                 logger.info(f"跳过已禁用的 MCP 服务器: {server_name}")
                 continue
 
-            try:
-                print(f"🚀 正在启动 MCP 服务器: {server_name}")
-                logger.info(f"Starting MCP server: {server_name}")
-                success = await mcp_manager.start_server(server_name)
-                print(f"   启动结果: {success}")
-
-                if success:
-                    # 获取服务器状态
-                    status = await mcp_manager.get_server_status(server_name)
-                    connected = status.get("connected", False)
-                    print(f"   连接状态: {connected}")
-
-                    if connected:
-                        # 获取工具列表
-                        tools = await mcp_manager.list_tools(server_name)
-                        tool_count = len(tools) if tools else 0
-
-                        # 获取资源列表
-                        resources = await mcp_manager.list_resources(server_name)
-                        resource_count = len(resources) if resources else 0
-
-                        result_msg = (
-                            f"✅ MCP server '{server_name}' started successfully "
-                            f"({tool_count} tools, {resource_count} resources)"
-                        )
-                        print(f"   {result_msg}")
-                        logger.info(result_msg)
-                    else:
-                        warn_msg = f"⚠️ MCP server '{server_name}' started but not connected"
-                        print(f"   {warn_msg}")
-                        logger.warning(warn_msg)
-                else:
-                    error_msg = f"❌ Failed to start MCP server: {server_name}"
-                    print(f"   {error_msg}")
-                    logger.warning(error_msg)
+            enabled_servers.append(server_name)
 
-            except Exception as e:
-                logger.error(f"Failed to start MCP server '{server_name}': {e}", exc_info=True)
+        semaphore = asyncio.Semaphore(_MCP_STARTUP_CONCURRENCY)
+        await asyncio.gather(
+            *(_start_mcp_server(mcp_manager, server_name, semaphore) for server_name in enabled_servers),
+            return_exceptions=True
+        )
 
         logger.info("MCP servers initialization completed")
 